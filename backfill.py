@@ -0,0 +1,47 @@
+"""Импорт истории Telegram-каналов в базу данных."""
+import argparse
+import asyncio
+from src.config import Config
+from src.database.db import init_db, close_db
+from src.parser.channel_parser import ChannelParser
+
+
+async def main(page_size: int | None, from_start: bool, channels: list[str] | None):
+    """Импорт истории каналов с продолжением с последних контрольных точек."""
+    Config.validate()
+    await init_db()
+    
+    parser = ChannelParser()
+    try:
+        await parser.client.start()
+        await parser.backfill(page_size=page_size, from_start=from_start, channels=channels)
+    finally:
+        await parser.stop()
+        await close_db()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Импорт истории Telegram-каналов")
+    arg_parser.add_argument(
+        "--page-size",
+        type=int,
+        default=None,
+        help="Количество сообщений на страницу (по умолчанию BACKFILL_PAGE_SIZE)"
+    )
+    arg_parser.add_argument(
+        "--from-start",
+        action="store_true",
+        help="Игнорировать контрольные точки и начать импорт с начала каналов"
+    )
+    arg_parser.add_argument(
+        "--channel",
+        action="append",
+        choices=Config.CHANNEL_IDS,
+        help="Импортировать только указанный канал (можно повторять)"
+    )
+    args = arg_parser.parse_args()
+    
+    try:
+        asyncio.run(main(args.page_size, args.from_start, args.channel))
+    except KeyboardInterrupt:
+        print("\n⚠️ Импорт прерван, при следующем запуске он продолжится с контрольной точки")
@@ -0,0 +1,377 @@
+"""
+Нагрузочный тест бота: виртуальные пользователи проходят сценарии через диспетчер create_bot.
+
+Бот отправляет запросы в локальную имитацию Bot API, база данных - временная
+SQLite с заранее загруженными постами. Каждый пользователь заполняет заявку
+(ApplicationForm), открывает статистику и листает ленту постов, нажимая
+кнопку "Вперед" из последнего полученного сообщения.
+
+С --workers N бот работает в N отдельных процессах, как воркеры вебхука:
+у каждого свое хранилище FSM и подключение к шине событий, а каждое
+обновление отправляется случайному воркеру. Так проверяется, что шаги
+заявки не теряются, когда соседние обновления пользователя попадают в
+разные процессы.
+"""
+import argparse
+import asyncio
+import itertools
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from aiohttp import web, ClientSession
+from aiogram.types import Update
+from src.bot.fake_api import FakeBotAPI, message_update, callback_update
+
+
+FIRST_USER_ID = 1000
+ADMIN_IDS = (1, 2)
+FIRST_WORKER_PORT = 8180
+NAMES = ("Иван Петров", "Анна Смирнова", "Олег Кузнецов", "Мария Иванова", "Сергей Попов")
+
+
+def configure_environment(directory: str, api_port: int, workers: int):
+    """
+    Настройки бота для теста; задаются до импорта src.config и наследуются процессами воркеров.
+    
+    Лимиты отправки Telegram сняты, чтобы уведомления из outbox доставлялись
+    имитации Bot API во время теста, а не копились до остановки.
+    """
+    database_path = os.path.join(directory, "load_test.db")
+    os.environ['DATABASE_URL'] = f"sqlite:///{database_path}"
+    os.environ.pop('ASYNC_DATABASE_URL', None)
+    os.environ['BOT_API_URL'] = f"http://127.0.0.1:{api_port}"
+    os.environ['BOT_TOKEN'] = '123456:LOAD-TEST'
+    os.environ['LEADER_ID'], os.environ['MANAGER_ID'] = map(str, ADMIN_IDS)
+    os.environ.setdefault('SENDER_GLOBAL_RATE', '100000')
+    os.environ.setdefault('SENDER_CHAT_RATE', '100000')
+    if workers > 1:
+        os.environ['BOT_MODE'] = 'webhook'
+        os.environ['WEBHOOK_URL'] = 'https://load-test.invalid'
+        os.environ['WEBHOOK_WORKERS'] = str(workers)
+        os.environ['IPC_SOCKET'] = os.path.join(directory, "events.sock")
+
+
+def percentile(values: list[float], share: float) -> float:
+    """Перцентиль по методу ближайшего ранга для отсортированного списка."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, round(share * len(values)) - 1))]
+
+
+async def serve_worker(port: int):
+    """
+    Воркер бота для проверки с несколькими процессами.
+    
+    Обновления принимаются по HTTP и обрабатываются до ответа, чтобы
+    клиент замерял полное время обработки; GET /status сообщает число
+    запросов к БД и подключение к шине событий.
+    """
+    from sqlalchemy import event
+    from src.bot.bot import create_bot
+    from src.database.db import async_engine, close_db
+    from src.utils.ipc import EventBus
+    
+    event_bus = EventBus()
+    bot, dp = create_bot(event_bus)
+    queries = 0
+    
+    def count_query(*_):
+        nonlocal queries
+        queries += 1
+    
+    event.listen(async_engine.sync_engine, 'before_cursor_execute', count_query)
+    
+    async def handle_update(request: web.Request) -> web.Response:
+        update = Update.model_validate(await request.json(), context={'bot': bot})
+        try:
+            await dp.feed_update(bot, update)
+        except Exception as e:
+            return web.Response(status=500, text=str(e))
+        return web.Response(text='ok')
+    
+    async def handle_status(request: web.Request) -> web.Response:
+        return web.json_response({'queries': queries, 'connected': event_bus.connected})
+    
+    stop = asyncio.Event()
+    
+    async def handle_stop(request: web.Request) -> web.Response:
+        stop.set()
+        return web.Response(text='ok')
+    
+    app = web.Application()
+    app.router.add_post('/update', handle_update)
+    app.router.add_get('/status', handle_status)
+    app.router.add_post('/stop', handle_stop)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', port).start()
+    await dp.emit_startup(bot=bot, dispatcher=dp, **dp.workflow_data)
+    try:
+        await stop.wait()
+    finally:
+        await runner.cleanup()
+        await dp.emit_shutdown(bot=bot, dispatcher=dp, **dp.workflow_data)
+        await dp.storage.close()
+        await bot.session.close()
+        await close_db()
+
+
+def load_worker(port: int):
+    """Точка входа процесса воркера."""
+    asyncio.run(serve_worker(port))
+
+
+class WorkerPool:
+    """Процессы воркеров бота и брокер шины событий между ними."""
+    
+    def __init__(self, count: int):
+        self.urls = [f"http://127.0.0.1:{FIRST_WORKER_PORT + index}" for index in range(count)]
+        self._context = multiprocessing.get_context('spawn')
+        self._processes = []
+        self._broker = None
+    
+    async def start(self, session: ClientSession, timeout: float = 30.0):
+        """Запуск воркеров и ожидание их подключения к шине событий."""
+        from src.utils.ipc import EventBroker
+        
+        self._broker = EventBroker()
+        await self._broker.start()
+        for index in range(len(self.urls)):
+            process = self._context.Process(target=load_worker, args=(FIRST_WORKER_PORT + index,))
+            process.start()
+            self._processes.append(process)
+        
+        deadline = time.monotonic() + timeout
+        for url in self.urls:
+            while True:
+                try:
+                    async with session.get(f"{url}/status") as response:
+                        if (await response.json())['connected']:
+                            break
+                except OSError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Воркер {url} не запустился за {timeout} с")
+                await asyncio.sleep(0.1)
+    
+    async def queries(self, session: ClientSession) -> int:
+        """Запросы к БД во всех воркерах."""
+        total = 0
+        for url in self.urls:
+            async with session.get(f"{url}/status") as response:
+                total += (await response.json())['queries']
+        return total
+    
+    async def stop(self, session: ClientSession):
+        """Остановка воркеров (с записью состояний FSM) и брокера."""
+        for url in self.urls:
+            try:
+                async with session.post(f"{url}/stop"):
+                    pass
+            except OSError:
+                pass
+        for process in self._processes:
+            await asyncio.to_thread(process.join, 30)
+            if process.is_alive():
+                process.kill()
+        if self._broker is not None:
+            await self._broker.stop()
+
+
+class LoadClient:
+    """
+    Передача обновлений в диспетчер с замером времени обработки по шагам сценария.
+    
+    С session и urls обновления отправляются случайному воркеру по HTTP.
+    """
+    
+    def __init__(self, bot, dp, api: FakeBotAPI, think_time: float = 0.0, session=None, urls=()):
+        self.bot = bot
+        self.dp = dp
+        self.api = api
+        self.session = session
+        self.urls = urls
+        self.think_time = think_time
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors = 0
+        self._update_ids = itertools.count(1)
+    
+    async def feed(self, step: str, update: dict):
+        """Обработка одного обновления так же, как при получении через вебхук."""
+        if self.think_time:
+            await asyncio.sleep(random.uniform(0, self.think_time))
+        
+        started = time.perf_counter()
+        try:
+            if self.urls:
+                async with self.session.post(f"{random.choice(self.urls)}/update", json=update) as response:
+                    if response.status != 200:
+                        raise RuntimeError(await response.text())
+            else:
+                await self.dp.feed_update(self.bot, Update.model_validate(update, context={'bot': self.bot}))
+        except Exception as e:
+            self.errors += 1
+            print(f"Ошибка обработки шага {step}: {e}")
+        self.latencies[step].append(time.perf_counter() - started)
+    
+    async def message(self, step: str, user_id: int, text: str):
+        await self.feed(step, message_update(next(self._update_ids), user_id, text))
+    
+    async def press(self, step: str, user_id: int, button_text: str) -> bool:
+        """Нажатие кнопки последнего сообщения пользователя. False, если кнопки нет."""
+        button = self.api.find_button(user_id, button_text)
+        if button is None:
+            return False
+        message_id, data = button
+        await self.feed(step, callback_update(next(self._update_ids), user_id, data, message_id))
+        return True
+
+
+async def user_session(client: LoadClient, user_id: int, pages: int):
+    """Сценарий одного пользователя: заявка, статистика и просмотр ленты постов."""
+    await client.message("start", user_id, "/start")
+    await client.message("form", user_id, "📋 Создать заявку")
+    await client.message("form", user_id, random.choice(NAMES))
+    await client.message("form", user_id, f"user{user_id}@example.com")
+    await client.message("form_submit", user_id, f"Нужен лендинг для проекта номер {user_id}")
+    await client.message("statistics", user_id, "📊 Статистика заявок")
+    await client.message("posts", user_id, "📰 Просмотреть посты")
+    for _ in range(pages):
+        if not await client.press("posts_page", user_id, "Вперед"):
+            break
+
+
+async def seed_posts(count: int):
+    """Загрузка постов для ленты с разными датами создания."""
+    from src.database.db import AsyncSessionLocal
+    from src.database.models import Post
+    
+    now = datetime.now().replace(microsecond=0)
+    async with AsyncSessionLocal() as db:
+        db.add_all(
+            Post(
+                channel_id="@load_test",
+                message_id=index,
+                service_type="Лендинг",
+                description=f"Тестовый пост {index} для нагрузочного теста ленты",
+                published_date=now - timedelta(minutes=index),
+                created_at=now - timedelta(minutes=index)
+            )
+            for index in range(1, count + 1)
+        )
+        await db.commit()
+
+
+async def run(args) -> bool:
+    """Запуск теста и вывод отчета. Возвращает True, если ошибок не было."""
+    from sqlalchemy import event, select, func
+    from src.bot.bot import create_bot
+    from src.database.db import async_engine, init_db, close_db, AsyncSessionLocal
+    from src.database.models import Application
+    
+    api = FakeBotAPI(args.latency)
+    await api.start(port=args.api_port)
+    session = ClientSession()
+    pool = WorkerPool(args.workers) if args.workers > 1 else None
+    try:
+        await init_db()
+        await seed_posts(args.posts)
+        
+        queries = 0
+        
+        def count_query(*_):
+            nonlocal queries
+            queries += 1
+        
+        if pool is not None:
+            await pool.start(session)
+            bot = dp = None
+            client = LoadClient(None, None, api, args.think, session, pool.urls)
+        else:
+            bot, dp = create_bot()
+            client = LoadClient(bot, dp, api, args.think)
+            await dp.emit_startup(bot=bot, dispatcher=dp, **dp.workflow_data)
+            event.listen(async_engine.sync_engine, 'before_cursor_execute', count_query)
+        calls_before = api.calls.copy()
+        
+        semaphore = asyncio.Semaphore(args.concurrency or args.users)
+        
+        async def limited(user_id: int):
+            async with semaphore:
+                await user_session(client, user_id, args.pages)
+        
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(*(
+                limited(user_id) for user_id in range(FIRST_USER_ID, FIRST_USER_ID + args.users)
+            ))
+            elapsed = time.perf_counter() - started
+        finally:
+            if pool is not None:
+                queries = await pool.queries(session)
+                await pool.stop(session)
+            else:
+                await dp.emit_shutdown(bot=bot, dispatcher=dp, **dp.workflow_data)
+                await dp.storage.close()
+                await bot.session.close()
+                event.remove(async_engine.sync_engine, 'before_cursor_execute', count_query)
+        
+        async with AsyncSessionLocal() as db:
+            applications = await db.scalar(select(func.count(Application.id)))
+    finally:
+        await session.close()
+        await api.stop()
+        await close_db()
+    
+    all_latencies = sorted(itertools.chain.from_iterable(client.latencies.values()))
+    updates = len(all_latencies)
+    calls = api.calls - calls_before
+    
+    print(f"Пользователей: {args.users}, одновременно: {args.concurrency or args.users}, процессов бота: {args.workers}")
+    print(f"Обновлений: {updates}, ошибок: {client.errors}, время: {elapsed:.2f} с")
+    print(f"Обновлений в секунду: {updates / elapsed:,.0f}")
+    print(f"Запросов к БД на обновление: {queries / max(updates, 1):.2f}")
+    print(f"Вызовы Bot API: {dict(calls)}")
+    print()
+    print(f"{'Шаг':<14}{'обновлений':>12}{'p50, мс':>10}{'p95, мс':>10}{'p99, мс':>10}{'max, мс':>10}")
+    for step, values in [*client.latencies.items(), ("всего", all_latencies)]:
+        values = sorted(values)
+        print(
+            f"{step:<14}{len(values):>12}"
+            + "".join(f"{percentile(values, share) * 1000:>10.1f}" for share in (0.5, 0.95, 0.99, 1.0))
+        )
+    
+    if applications != args.users:
+        print(f"\n❌ Создано заявок: {applications}, ожидалось: {args.users}")
+        return False
+    return client.errors == 0
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Нагрузочный тест бота с имитацией Bot API")
+    arg_parser.add_argument("--users", type=int, default=2000, help="Количество виртуальных пользователей")
+    arg_parser.add_argument("--concurrency", type=int, default=0, help="Одновременно активных пользователей (0 - все)")
+    arg_parser.add_argument("--pages", type=int, default=3, help="Сколько страниц ленты листает пользователь")
+    arg_parser.add_argument("--posts", type=int, default=500, help="Количество постов в базе")
+    arg_parser.add_argument("--think", type=float, default=0.0, help="Максимальная пауза пользователя между шагами, с")
+    arg_parser.add_argument("--latency", type=float, default=0.0, help="Задержка ответа имитации Bot API, с")
+    arg_parser.add_argument("--workers", type=int, default=1, help="Процессов бота, как воркеров вебхука (1 - диспетчер в процессе теста)")
+    arg_parser.add_argument("--api-port", type=int, default=8081, help="Порт имитации Bot API")
+    arg_parser.add_argument("--seed", type=int, default=42, help="Начальное значение генератора случайных чисел")
+    args = arg_parser.parse_args()
+    
+    random.seed(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        configure_environment(directory, args.api_port, args.workers)
+        succeeded = asyncio.run(run(args))
+    
+    if not succeeded:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Микро-бенчмарк извлечения данных из постов: прежний _parse_message против ExtractionEngine."""
+import argparse
+import random
+import re
+import time
+from src.parser.extraction import ExtractionEngine
+
+
+WORDS = (
+    "команда завершила работу над заказом клиента сроки соблюдены качество "
+    "высокое интеграция платформа автоматизация дизайн адаптивная верстка "
+    "мобильное приложение телеграм бот аналитика отчеты поддержка запуск"
+).split()
+
+
+def legacy_parse_message(text: str) -> dict:
+    """Реализация ChannelParser._parse_message до перехода на ExtractionEngine."""
+    result = {
+        'service_type': None,
+        'description': None
+    }
+    
+    if not text:
+        return result
+    
+    service_patterns = [
+        r'(?:тип|услуга|проект|вид)[\s:]+([^\n]+)',
+        r'(?:выполнен|сделан|реализован)[\s:]+([^\n]+)',
+    ]
+    
+    for pattern in service_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            result['service_type'] = match.group(1).strip()
+            break
+    
+    if not result['service_type']:
+        lines = text.split('\n')
+        if lines:
+            first_line = lines[0].strip()
+            if len(first_line) < 100:
+                result['service_type'] = first_line
+    
+    result['description'] = text[:500] if len(text) > 500 else text
+    
+    return result
+
+
+def build_corpus(size: int, seed: int = 42) -> list[str]:
+    """Генерация постов канала: с явным типом услуги, с итогом в конце и без разметки."""
+    rng = random.Random(seed)
+    corpus = []
+    
+    for index in range(size):
+        body = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(20, 150)))
+        kind = index % 4
+        if kind == 0:
+            corpus.append(f"Новый кейс\nТип: Лендинг для кофейни\n{body}")
+        elif kind == 1:
+            corpus.append(f"Кейс недели\n{body}\nРеализован: интернет-магазин одежды")
+        elif kind == 2:
+            corpus.append(f"{body.capitalize()}\n\n{body}")
+        else:
+            corpus.append(f"Проект: CRM для сети салонов\n{body}\n{body}")
+    
+    return corpus
+
+
+def measure(function, corpus: list[str], repeat: int) -> float:
+    """Лучший результат в сообщениях в секунду из repeat прогонов."""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(corpus)
+        best = min(best, time.perf_counter() - started)
+    return len(corpus) / best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Бенчмарк извлечения данных из постов")
+    arg_parser.add_argument("--size", type=int, default=5000, help="Размер корпуса сообщений")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Количество прогонов")
+    args = arg_parser.parse_args()
+    
+    corpus = build_corpus(args.size)
+    engine = ExtractionEngine.from_config()
+    
+    mismatches = sum(
+        legacy_parse_message(text) != parsed
+        for text, parsed in zip(corpus, engine.parse_many(corpus))
+    )
+    if mismatches:
+        raise SystemExit(f"Результаты расходятся с прежней реализацией: {mismatches} сообщений")
+    
+    legacy = measure(lambda texts: [legacy_parse_message(text) for text in texts], corpus, args.repeat)
+    current = measure(engine.parse_many, corpus, args.repeat)
+    
+    print(f"Сообщений в корпусе: {len(corpus)}")
+    print(f"_parse_message (прежний): {legacy:,.0f} сообщ./сек")
+    print(f"ExtractionEngine.parse_many: {current:,.0f} сообщ./сек")
+    print(f"Ускорение: x{current / legacy:.2f}")
+
+
+if __name__ == "__main__":
+    main()
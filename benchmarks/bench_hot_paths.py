@@ -0,0 +1,312 @@
+"""
+Микро-бенчмарки горячих функций: разбор постов, валидация заявок и отрисовка постов.
+
+Корпуса - тексты на русском языке, включая длинные сообщения у границ
+500 (описание поста) и 2000 (описание задачи) символов. Для каждой функции
+выводятся вызовы в секунду и память, выделяемая за вызов (пик по tracemalloc).
+Результаты можно сохранить в baseline-файл и сравнивать с ним при ревью.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Callable
+from src.bot.handlers.posts import format_post
+from src.database.models import Post
+from src.parser.channel_parser import ChannelParser
+from src.parser.extraction import ExtractionEngine
+from src.utils.validators import validate_name, validate_contact, validate_task_description
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+REFERENCE = "reference"
+REFERENCE_PATTERN = re.compile(r'\w+')
+
+WORDS = (
+    "команда завершила работу над заказом клиента сроки соблюдены качество "
+    "высокое интеграция платформа автоматизация дизайн адаптивная верстка "
+    "мобильное приложение телеграм бот аналитика отчеты поддержка запуск "
+    "интернет-магазин каталог корзина оплата доставка личный кабинет"
+).split()
+FIRST_NAMES = ("Иван", "Анна", "Олег", "Мария", "Сергей", "Екатерина", "Дмитрий", "Ольга", "Алексей")
+LAST_NAMES = ("Петров", "Смирнова", "Кузнецов", "Иванова", "Попов", "Соколова", "Лебедев", "Новикова")
+SERVICES = ("Лендинг для кофейни", "CRM для сети салонов", "Telegram-бот для записи", "Интернет-магазин одежды")
+
+
+def words(rng: random.Random, length: int) -> str:
+    """Текст из случайных слов длиной не менее length символов."""
+    parts = []
+    size = 0
+    while size < length:
+        word = rng.choice(WORDS)
+        parts.append(word)
+        size += len(word) + 1
+    return ' '.join(parts)
+
+
+def build_posts(size: int, rng: random.Random, long_only: bool = False) -> list[str]:
+    """Посты канала: с явным типом услуги, с итогом в конце, без разметки; длинные - у границы 500 символов и дальше."""
+    corpus = []
+    for index in range(size):
+        length = rng.choice((450, 495, 500, 505, 1500, 4000)) if long_only or index % 3 == 0 else rng.randint(80, 400)
+        body = words(rng, length)
+        service = rng.choice(SERVICES)
+        kind = index % 4
+        if kind == 0:
+            corpus.append(f"Новый кейс\nТип: {service}\n{body}")
+        elif kind == 1:
+            corpus.append(f"Кейс недели\n{body}\nРеализован: {service}")
+        elif kind == 2:
+            corpus.append(f"{body.capitalize()}\n\n{body}")
+        else:
+            corpus.append(f"Проект: {service}\n{body}")
+    return corpus
+
+
+def build_names(size: int, rng: random.Random) -> list[str]:
+    """Имена: обычные, двойные через дефис, у границы 100 символов и с недопустимыми символами."""
+    corpus = []
+    for index in range(size):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        kind = index % 6
+        if kind == 1:
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}-{rng.choice(LAST_NAMES)}"
+        elif kind == 2:
+            name = (name + " ") * 8
+            name = name[:rng.choice((99, 100, 101))]
+        elif kind == 3:
+            name = f"{name} 2024"
+        elif kind == 4:
+            name = rng.choice(("И", "  ", "Анна_Смирнова"))
+        corpus.append(name)
+    return corpus
+
+
+def build_contacts(size: int, rng: random.Random) -> list[str]:
+    """Контакты: email, телефоны в разных форматах, Telegram username и ошибочные значения."""
+    corpus = []
+    for index in range(size):
+        digits = ''.join(str(rng.randint(0, 9)) for _ in range(10))
+        kind = index % 6
+        if kind == 0:
+            contact = f"{rng.choice(('ivan', 'anna.petrova', 'o_kuznetsov'))}{index}@{rng.choice(('mail.ru', 'yandex.ru', 'gmail.com'))}"
+        elif kind == 1:
+            contact = f"+7 ({digits[:3]}) {digits[3:6]}-{digits[6:8]}-{digits[8:]}"
+        elif kind == 2:
+            contact = f"8{digits}"
+        elif kind == 3:
+            contact = f"@user_{digits[:6]}"
+        elif kind == 4:
+            contact = f" {rng.choice(('ivan@', 'позвоните мне', '+7 999', '@abc'))} "
+        else:
+            contact = f"{digits[:3]}-{digits[3:6]}-{digits[6:8]}-{digits[8:]}"
+        corpus.append(contact)
+    return corpus
+
+
+def build_descriptions(size: int, rng: random.Random) -> list[str]:
+    """Описания задач: короткие, обычные и у границы 2000 символов."""
+    corpus = []
+    for index in range(size):
+        kind = index % 5
+        if kind == 0:
+            corpus.append(rng.choice(("Лендинг", "   ", "Нужен бот")))
+        elif kind in (1, 2):
+            corpus.append(words(rng, rng.randint(40, 400)))
+        else:
+            corpus.append(words(rng, 2100)[:rng.choice((1990, 2000, 2001, 2100))])
+    return corpus
+
+
+def build_post_rows(size: int, rng: random.Random) -> list[Post]:
+    """Посты из базы данных для отрисовки, в том числе с описанием длиннее 300 символов."""
+    now = datetime.now()
+    rows = []
+    for index, text in enumerate(build_posts(size, rng)):
+        rows.append(Post(
+            id=index + 1,
+            channel_id="@team_channel",
+            message_id=index + 1,
+            service_type=rng.choice(SERVICES) if index % 5 else None,
+            description=text[:500],
+            published_date=now - timedelta(hours=index) if index % 4 else None,
+            created_at=now - timedelta(hours=index)
+        ))
+    return rows
+
+
+def reference_workload(text: str) -> int:
+    """Эталонная нагрузка, не зависящая от кода проекта: по ней оценивается текущая скорость машины."""
+    return len(REFERENCE_PATTERN.findall(text.lower())) + len(text.split())
+
+
+def benchmark_parser() -> Callable[[str], dict]:
+    """ChannelParser._parse_message без подключения к Telegram."""
+    parser = ChannelParser.__new__(ChannelParser)
+    parser.extractor = ExtractionEngine.from_config()
+    return parser._parse_message
+
+
+def build_suite(size: int, seed: int) -> dict[str, tuple[Callable[[Any], Any], list]]:
+    """Бенчмарки: имя -> (функция одного аргумента, корпус)."""
+    rng = random.Random(seed)
+    parse_message = benchmark_parser()
+    return {
+        "parse_message": (parse_message, build_posts(size, rng)),
+        "parse_message_long": (parse_message, build_posts(size, rng, long_only=True)),
+        "validate_name": (validate_name, build_names(size, rng)),
+        "validate_contact": (validate_contact, build_contacts(size, rng)),
+        "validate_task_description": (validate_task_description, build_descriptions(size, rng)),
+        "format_post": (format_post, build_post_rows(size, rng)),
+    }
+
+
+def measure_run(function: Callable[[Any], Any], corpus: list) -> float:
+    """Время одного прогона функции по корпусу, в секундах."""
+    started = time.perf_counter()
+    for item in corpus:
+        function(item)
+    return time.perf_counter() - started
+
+
+def measure_allocations(function: Callable[[Any], Any], corpus: list) -> float:
+    """Средний пик памяти, выделенной за один вызов, в байтах."""
+    total = 0
+    tracemalloc.start()
+    try:
+        for item in corpus:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            function(item)
+            total += tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    return total / len(corpus)
+
+
+def run_suite(size: int, repeat: int, seed: int, only: str | None = None) -> dict[str, dict]:
+    """
+    Результаты всех бенчмарков (или содержащих only в имени) и эталонной нагрузки.
+    
+    Прогоны чередуются по кругу (все бенчмарки, затем снова все), чтобы
+    колебания скорости машины одинаково влияли на каждый, а скорость
+    считается по медиане прогонов, а не по лучшему из них.
+    """
+    suite = {name: benchmark for name, benchmark in build_suite(size, seed).items() if not only or only in name}
+    suite[REFERENCE] = (reference_workload, build_posts(size, random.Random(seed)))
+    timings: dict[str, list[float]] = {name: [] for name in suite}
+    for _ in range(repeat):
+        for name, (function, corpus) in suite.items():
+            timings[name].append(measure_run(function, corpus))
+    
+    return {
+        name: {
+            'ops_per_sec': round(len(corpus) / statistics.median(timings[name])),
+            'alloc_bytes': round(measure_allocations(function, corpus)),
+        }
+        for name, (function, corpus) in suite.items()
+    }
+
+
+def print_results(results: dict[str, dict]):
+    """Таблица результатов."""
+    print(f"{'Бенчмарк':<28}{'вызовов/сек':>14}{'байт/вызов':>12}")
+    for name, result in results.items():
+        print(f"{name:<28}{result['ops_per_sec']:>14,}{result['alloc_bytes']:>12,}")
+
+
+def check_baseline(baseline: dict, size: int, seed: int):
+    """Baseline должен быть снят на тех же корпусах, иначе сравнение бессмысленно."""
+    expected = {'size': size, 'seed': seed}
+    recorded = {key: baseline.get(key) for key in expected}
+    if recorded != expected:
+        raise SystemExit(
+            f"Baseline снят с параметрами {recorded}, а запуск - с {expected}; "
+            f"повторите запуск с теми же --size и --seed или пересоздайте baseline (--save)"
+        )
+    if REFERENCE not in baseline['results']:
+        raise SystemExit("В baseline нет эталонной нагрузки, пересоздайте его (--save)")
+
+
+def compare(results: dict[str, dict], baseline: dict, threshold: float) -> list[str]:
+    """
+    Таблица сравнения с baseline. Возвращает имена бенчмарков с ухудшением больше threshold процентов.
+    
+    Скорость сравнивается относительно эталонной нагрузки из того же запуска:
+    общее замедление или ускорение машины на результат не влияет.
+    """
+    base_results = baseline['results']
+    machine = results[REFERENCE]['ops_per_sec'] / base_results[REFERENCE]['ops_per_sec']
+    print(f"Скорость машины относительно baseline: {(machine - 1) * 100:+.1f}% (учтена в сравнении)")
+    
+    regressions = []
+    print(f"{'Бенчмарк':<28}{'было, выз/с':>14}{'стало, выз/с':>14}{'изм.':>9}{'байт/вызов':>18}")
+    for name, result in results.items():
+        if name == REFERENCE:
+            continue
+        base = base_results.get(name)
+        if base is None:
+            print(f"{name:<28}{'-':>14}{result['ops_per_sec']:>14,}{'новый':>9}{result['alloc_bytes']:>18,}")
+            continue
+        
+        speed_change = (result['ops_per_sec'] / (base['ops_per_sec'] * machine) - 1) * 100
+        alloc_change = (result['alloc_bytes'] / base['alloc_bytes'] - 1) * 100 if base['alloc_bytes'] else 0.0
+        regressed = speed_change < -threshold or alloc_change > threshold
+        if regressed:
+            regressions.append(name)
+        print(
+            f"{name:<28}{base['ops_per_sec']:>14,}{result['ops_per_sec']:>14,}{speed_change:>+8.1f}%"
+            f"{base['alloc_bytes']:>8,} → {result['alloc_bytes']:<7,}"
+            + (" ⚠️" if regressed else "")
+        )
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Микро-бенчмарки парсера, валидаторов и отрисовки постов")
+    arg_parser.add_argument("--size", type=int, default=2000, help="Размер корпуса каждого бенчмарка")
+    arg_parser.add_argument("--repeat", type=int, default=20, help="Количество прогонов")
+    arg_parser.add_argument("--seed", type=int, default=42, help="Начальное значение генератора корпусов")
+    arg_parser.add_argument("--only", help="Запустить только бенчмарки, содержащие строку в имени")
+    arg_parser.add_argument("--baseline", default=BASELINE_PATH, help="Путь к baseline-файлу")
+    arg_parser.add_argument("--save", action="store_true", help="Сохранить результаты в baseline-файл")
+    arg_parser.add_argument("--compare", action="store_true", help="Сравнить результаты с baseline-файлом")
+    arg_parser.add_argument("--threshold", type=float, default=25.0, help="Допустимое ухудшение при сравнении, %%")
+    args = arg_parser.parse_args()
+    
+    baseline = None
+    if args.compare:
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        check_baseline(baseline, args.size, args.seed)
+    
+    results = run_suite(args.size, args.repeat, args.seed, args.only)
+    
+    if baseline is not None:
+        print(f"Baseline: {args.baseline} (Python {baseline['python']})")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            raise SystemExit(f"\nУхудшение больше {args.threshold}%: {', '.join(regressions)}")
+    else:
+        print_results(results)
+    
+    if args.save:
+        with open(args.baseline, 'w', encoding='utf-8') as baseline_file:
+            json.dump({
+                'python': platform.python_version(),
+                'size': args.size,
+                'seed': args.seed,
+                'results': results,
+            }, baseline_file, ensure_ascii=False, indent=4)
+            baseline_file.write('\n')
+        print(f"\nBaseline сохранен: {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Применение миграций схемы базы данных."""
+import argparse
+import asyncio
+from src.database.db import Base, async_engine, close_db
+from src.database.migrations import MIGRATIONS, pending_migrations, run_migrations
+
+
+async def main(list_only: bool):
+    """Вывод состояния миграций или применение недостающих в одной транзакции."""
+    try:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            if list_only:
+                pending = await conn.run_sync(pending_migrations)
+                for item in sorted(MIGRATIONS, key=lambda item: item.version):
+                    mark = "ожидает" if item in pending else "применена"
+                    print(f"{item.version:>4}  {item.name:<40} {mark}")
+                return
+            applied = await conn.run_sync(run_migrations)
+        print(f"✅ Применено миграций: {len(applied)}")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Миграции схемы базы данных")
+    arg_parser.add_argument(
+        "--list",
+        action="store_true",
+        help="Показать примененные и ожидающие миграции без их применения"
+    )
+    args = arg_parser.parse_args()
+    
+    asyncio.run(main(args.list))
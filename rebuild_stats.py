@@ -0,0 +1,20 @@
+"""Пересчет счетчиков статистики заявок по таблице заявок."""
+import asyncio
+from src.database.db import async_engine, init_db, close_db
+from src.database.stats import rebuild_application_stats
+
+
+async def main():
+    """Пересчет всех счетчиков в одной транзакции."""
+    await init_db()
+
+    try:
+        async with async_engine.begin() as conn:
+            rows = await conn.run_sync(rebuild_application_stats)
+        print(f"✅ Статистика заявок пересчитана, строк счетчиков: {rows}")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,19 +1,68 @@
 """Инициализация и настройка Telegram-бота."""
+import asyncio
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
-from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram.enums import ParseMode
 from src.config import Config
+from src.database.db import close_db
 from src.bot.handlers import commands, applications, posts
+from src.bot.sender import MessageSender
+from src.bot.outbox import OutboxWorker
+from src.bot.storage import DatabaseStorage
+from src.bot.throttling import ThrottlingMiddleware
+from src.bot.metrics import setup_bot_metrics
+from src.bot.tracing import setup_sql_tracing
+from src.utils.cache import follow_feed_events
+from src.utils.ipc import EventBus
+from src.utils.metrics import start_metrics_server
 
 
-def create_bot() -> tuple[Bot, Dispatcher]:
-    """Создание экземпляра бота и диспетчера."""
+def create_bot(event_bus: EventBus | None = None) -> tuple[Bot, Dispatcher]:
+    """
+    Создание экземпляра бота и диспетчера (с шиной событий - при работе отдельно от парсера).
+    
+    Если бот работает в нескольких процессах вебхука, хранилище FSM
+    синхронизируется между ними через шину событий.
+    """
+    session = None
+    if Config.BOT_API_URL:
+        session = AiohttpSession(api=TelegramAPIServer.from_base(Config.BOT_API_URL))
+    
     bot = Bot(
         token=Config.BOT_TOKEN,
+        session=session,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML)
     )
-    dp = Dispatcher(storage=MemoryStorage())
+    shared_storage = event_bus is not None and Config.BOT_MODE == 'webhook' and Config.WEBHOOK_WORKERS > 1
+    dp = Dispatcher(storage=DatabaseStorage(event_bus=event_bus if shared_storage else None))
+    
+    sender = MessageSender(bot)
+    outbox = OutboxWorker(sender)
+    dp["sender"] = sender
+    dp["outbox"] = outbox
+    dp.startup.register(sender.start)
+    dp.startup.register(outbox.start)
+    dp.shutdown.register(outbox.stop)
+    dp.shutdown.register(sender.stop)
+    
+    if event_bus is not None:
+        follow_feed_events(event_bus)
+        dp.startup.register(event_bus.start)
+        dp.shutdown.register(event_bus.stop)
+    
+    throttling = ThrottlingMiddleware({
+        commands.router: commands.throttling,
+        applications.router: applications.throttling,
+        posts.router: posts.throttling,
+    })
+    dp.message.middleware(throttling)
+    dp.callback_query.middleware(throttling)
+    if Config.METRICS_PORT:
+        setup_bot_metrics(dp, sender)
+    if Config.SQL_TRACE:
+        setup_sql_tracing(dp)
     
     dp.include_router(commands.router)
     dp.include_router(applications.router)
@@ -22,9 +71,9 @@ def create_bot() -> tuple[Bot, Dispatcher]:
     return bot, dp
 
 
-async def start_bot():
+async def start_bot(event_bus: EventBus | None = None):
     """Запуск бота."""
-    bot, dp = create_bot()
+    bot, dp = create_bot(event_bus)
     
     await bot.delete_webhook(drop_pending_updates=True)
     
@@ -38,3 +87,18 @@ async def stop_bot(bot: Bot):
     await bot.session.close()
     print("Бот остановлен")
 
+
+async def run_polling():
+    """Работа бота в режиме опроса отдельно от парсера до сигнала остановки."""
+    metrics = await start_metrics_server(1)
+    try:
+        await start_bot(EventBus())
+    finally:
+        if metrics is not None:
+            await metrics.stop()
+        await close_db()
+
+
+def polling_worker():
+    """Точка входа процесса бота в режиме опроса."""
+    asyncio.run(run_polling())
@@ -0,0 +1,154 @@
+"""Имитация Telegram Bot API для локального запуска и нагрузочного тестирования вебхука."""
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from collections import Counter
+from aiohttp import web, ClientSession, TCPConnector
+
+
+BOT_USER = {'id': 42, 'is_bot': True, 'first_name': 'FakeBot', 'username': 'fake_bot'}
+
+
+class FakeBotAPI:
+    """
+    HTTP-сервер, отвечающий на методы Bot API без обращения к Telegram.
+    
+    sendMessage возвращает сообщение с новым ID, остальные методы - True.
+    Последнее сообщение каждого чата вместе с клавиатурой сохраняется в
+    last_messages, чтобы нагрузочный тест мог нажимать его кнопки.
+    latency добавляет задержку к каждому ответу, имитируя сеть до Telegram.
+    """
+    
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls: Counter[str] = Counter()
+        self.last_messages: dict[int, dict] = {}
+        self._message_ids = itertools.count(1)
+        self._runner: web.AppRunner | None = None
+        self.app = web.Application()
+        self.app.router.add_route('*', '/bot{token}/{method}', self._handle)
+    
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info['method']
+        self.calls[method] += 1
+        params = dict(await request.post())
+        
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        
+        if method == 'getMe':
+            result = BOT_USER
+        elif method == 'sendMessage':
+            result = {
+                'message_id': next(self._message_ids),
+                'date': int(time.time()),
+                'chat': {'id': int(params.get('chat_id', 0)), 'type': 'private'},
+                'from': BOT_USER,
+                'text': params.get('text', ''),
+            }
+            self.last_messages[result['chat']['id']] = {
+                **result,
+                'reply_markup': json.loads(params['reply_markup']) if params.get('reply_markup') else None,
+            }
+        else:
+            result = True
+        return web.json_response({'ok': True, 'result': result})
+    
+    async def start(self, host: str = '127.0.0.1', port: int = 8081):
+        """Запуск сервера."""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+    
+    async def stop(self):
+        """Остановка сервера."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+    
+    def find_button(self, chat_id: int, text: str) -> tuple[int, str] | None:
+        """ID последнего сообщения чата и callback data его inline-кнопки, текст которой содержит text."""
+        message = self.last_messages.get(chat_id)
+        markup = message and message['reply_markup']
+        for row in (markup or {}).get('inline_keyboard', []):
+            for button in row:
+                if text in button.get('text', '') and 'callback_data' in button:
+                    return message['message_id'], button['callback_data']
+        return None
+
+
+def message_update(update_id: int, user_id: int, text: str) -> dict:
+    """Обновление Bot API с текстовым сообщением пользователя."""
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': user_id, 'type': 'private'},
+            'from': {'id': user_id, 'is_bot': False, 'first_name': f'User {user_id}'},
+            'text': text,
+        },
+    }
+
+
+def callback_update(update_id: int, user_id: int, data: str, message_id: int = 1) -> dict:
+    """Обновление Bot API с нажатием inline-кнопки."""
+    return {
+        'update_id': update_id,
+        'callback_query': {
+            'id': str(update_id),
+            'chat_instance': str(user_id),
+            'from': {'id': user_id, 'is_bot': False, 'first_name': f'User {user_id}'},
+            'data': data,
+            'message': {
+                'message_id': message_id,
+                'date': int(time.time()),
+                'chat': {'id': user_id, 'type': 'private'},
+                'text': '',
+            },
+        },
+    }
+
+
+async def post_updates(url: str, updates: list[dict], concurrency: int = 50, secret: str = '') -> float:
+    """Отправка обновлений на вебхук так, как это делает Telegram. Возвращает затраченное время."""
+    headers = {'X-Telegram-Bot-Api-Secret-Token': secret} if secret else {}
+    queue = iter(updates)
+    
+    async def worker(session: ClientSession):
+        for update in queue:
+            async with session.post(url, json=update, headers=headers) as response:
+                if response.status != 200:
+                    raise RuntimeError(f"Вебхук ответил {response.status} на обновление {update['update_id']}")
+    
+    started = time.perf_counter()
+    async with ClientSession(connector=TCPConnector(limit=concurrency)) as session:
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+    return time.perf_counter() - started
+
+
+async def main(host: str, port: int, latency: float):
+    """Запуск имитации Bot API до прерывания."""
+    api = FakeBotAPI(latency)
+    await api.start(host, port)
+    print(f"Имитация Bot API: http://{host}:{port} (задайте BOT_API_URL)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await api.stop()
+        print(f"Вызовы методов: {dict(api.calls)}")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Имитация Telegram Bot API")
+    arg_parser.add_argument("--host", default="127.0.0.1", help="Адрес сервера")
+    arg_parser.add_argument("--port", type=int, default=8081, help="Порт сервера")
+    arg_parser.add_argument("--latency", type=float, default=0.0, help="Задержка ответа в секундах")
+    args = arg_parser.parse_args()
+    
+    try:
+        asyncio.run(main(args.host, args.port, args.latency))
+    except KeyboardInterrupt:
+        pass
@@ -1,19 +1,46 @@
 """Обработчики заявок."""
-from aiogram import Router, F
+from datetime import datetime, timedelta
+from aiogram import Router, F, html
+from aiogram.filters import Command, CommandObject
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import datetime, timedelta
-from src.database.db import SessionLocal
+from sqlalchemy import select, update, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.db import AsyncSessionLocal
 from src.database.models import Application, ApplicationStatus
-from src.bot.keyboards import get_main_keyboard, get_cancel_keyboard, get_application_status_keyboard
+from src.database.stats import (
+    StatsDeltas, add_stats_delta, apply_stats_deltas,
+    get_statistics, record_new_application
+)
+from src.database.outbox import enqueue_notification, enqueue_notifications
+from src.bot.keyboards import get_main_keyboard, get_cancel_keyboard, get_application_status_keyboard, get_inbox_keyboard, get_bulk_confirm_keyboard
 from src.utils.validators import validate_name, validate_contact, validate_task_description
+from src.bot.outbox import OutboxWorker
 from src.config import Config
-from aiogram import Bot
+from src.bot.throttling import ThrottleLimit
 
 router = Router()
+throttling = ThrottleLimit(*Config.THROTTLE_APPLICATIONS)
+
+APPLICATIONS_PER_PAGE = 5
+
+STATUS_NAMES = {
+    ApplicationStatus.NEW: "Новая",
+    ApplicationStatus.IN_PROGRESS: "В работе",
+    ApplicationStatus.COMPLETED: "Завершена"
+}
+
+STATUS_ICONS = {
+    ApplicationStatus.NEW: "🆕",
+    ApplicationStatus.IN_PROGRESS: "⚙️",
+    ApplicationStatus.COMPLETED: "✅"
+}
+
+
+def is_admin(user_id: int) -> bool:
+    """Является ли пользователь руководителем или менеджером."""
+    return user_id == Config.LEADER_ID or user_id == Config.MANAGER_ID
 
 
 class ApplicationForm(StatesGroup):
@@ -23,6 +50,10 @@ class ApplicationForm(StatesGroup):
     task_description = State()
 
 
+# Команды (/inbox, /search и другие) во время заполнения заявки обрабатываются своими обработчиками
+FORM_INPUT = ~F.text.startswith("/")
+
+
 @router.message(F.text == "📋 Создать заявку")
 async def start_application(message: Message, state: FSMContext):
     """Начало создания заявки."""
@@ -49,7 +80,7 @@ async def cancel_application(message: Message, state: FSMContext):
     )
 
 
-@router.message(ApplicationForm.name)
+@router.message(ApplicationForm.name, FORM_INPUT)
 async def process_name(message: Message, state: FSMContext):
     """Обработка имени."""
     name = message.text
@@ -68,7 +99,7 @@ async def process_name(message: Message, state: FSMContext):
     )
 
 
-@router.message(ApplicationForm.contact)
+@router.message(ApplicationForm.contact, FORM_INPUT)
 async def process_contact(message: Message, state: FSMContext):
     """Обработка контакта."""
     contact = message.text
@@ -86,8 +117,8 @@ async def process_contact(message: Message, state: FSMContext):
     )
 
 
-@router.message(ApplicationForm.task_description)
-async def process_task_description(message: Message, state: FSMContext, bot: Bot):
+@router.message(ApplicationForm.task_description, FORM_INPUT)
+async def process_task_description(message: Message, state: FSMContext, outbox: OutboxWorker):
     """Обработка описания задачи и сохранение заявки."""
     description = message.text
     
@@ -98,7 +129,7 @@ async def process_task_description(message: Message, state: FSMContext, bot: Bot
     
     data = await state.get_data()
     
-    db = SessionLocal()
+    db = AsyncSessionLocal()
     try:
         application = Application(
             user_id=message.from_user.id,
@@ -108,8 +139,9 @@ async def process_task_description(message: Message, state: FSMContext, bot: Bot
             status=ApplicationStatus.NEW
         )
         db.add(application)
-        db.commit()
-        db.refresh(application)
+        await db.flush()
+        await db.refresh(application)
+        await record_new_application(db, application)
         
         notification_text = (
             f"🔔 Новая заявка #{application.id}\n\n"
@@ -121,13 +153,14 @@ async def process_task_description(message: Message, state: FSMContext, bot: Bot
             f"📊 Статус: Новая"
         )
         
-        try:
-            if Config.LEADER_ID:
-                await bot.send_message(Config.LEADER_ID, notification_text)
-            if Config.MANAGER_ID:
-                await bot.send_message(Config.MANAGER_ID, notification_text)
-        except Exception as e:
-            print(f"Ошибка при отправке уведомлений: {e}")
+        await enqueue_notifications(db, [
+            (f"application:{application.id}:created:{admin_id}", admin_id, notification_text)
+            for admin_id in (Config.LEADER_ID, Config.MANAGER_ID)
+            if admin_id
+        ])
+        
+        await db.commit()
+        outbox.notify()
         
         await message.answer(
             "✅ Заявка успешно создана и отправлена руководителю и менеджеру!\n\n"
@@ -142,66 +175,40 @@ async def process_task_description(message: Message, state: FSMContext, bot: Bot
             reply_markup=get_main_keyboard()
         )
     finally:
-        db.close()
+        await db.close()
         await state.clear()
 
 
-@router.message(F.text == "📊 Статистика заявок")
+@router.message(F.text == "📊 Статистика заявок", flags={"throttling": ThrottleLimit(*Config.THROTTLE_STATISTICS)})
 async def show_statistics(message: Message):
     """Отображение статистики заявок."""
-    db = SessionLocal()
+    db = AsyncSessionLocal()
     try:
         user_id = message.from_user.id
         
-        is_admin = (user_id == Config.LEADER_ID or user_id == Config.MANAGER_ID)
-        
-        now = datetime.now()
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        week_start = today_start - timedelta(days=now.weekday())
-        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        
-        if is_admin:
-            total = db.query(Application).count()
-            today = db.query(Application).filter(Application.created_at >= today_start).count()
-            week = db.query(Application).filter(Application.created_at >= week_start).count()
-            month = db.query(Application).filter(Application.created_at >= month_start).count()
-            
-            new_count = db.query(Application).filter(Application.status == ApplicationStatus.NEW).count()
-            in_progress_count = db.query(Application).filter(Application.status == ApplicationStatus.IN_PROGRESS).count()
-            completed_count = db.query(Application).filter(Application.status == ApplicationStatus.COMPLETED).count()
+        if is_admin(user_id):
+            stats = await get_statistics(db)
             
             stats_text = (
                 f"📊 Статистика заявок\n\n"
-                f"📈 Всего заявок: {total}\n\n"
-                f"📅 За сегодня: {today}\n"
-                f"📅 За неделю: {week}\n"
-                f"📅 За месяц: {month}\n\n"
+                f"📈 Всего заявок: {stats['total']}\n\n"
+                f"📅 За сегодня: {stats['today']}\n"
+                f"📅 За неделю: {stats['week']}\n"
+                f"📅 За месяц: {stats['month']}\n\n"
                 f"📋 По статусам:\n"
-                f"🆕 Новые: {new_count}\n"
-                f"⚙️ В работе: {in_progress_count}\n"
-                f"✅ Завершены: {completed_count}"
+                f"🆕 Новые: {stats[ApplicationStatus.NEW.value]}\n"
+                f"⚙️ В работе: {stats[ApplicationStatus.IN_PROGRESS.value]}\n"
+                f"✅ Завершены: {stats[ApplicationStatus.COMPLETED.value]}"
             )
         else:
-            user_total = db.query(Application).filter(Application.user_id == user_id).count()
-            user_today = db.query(Application).filter(
-                Application.user_id == user_id,
-                Application.created_at >= today_start
-            ).count()
-            user_week = db.query(Application).filter(
-                Application.user_id == user_id,
-                Application.created_at >= week_start
-            ).count()
-            user_month = db.query(Application).filter(
-                Application.user_id == user_id,
-                Application.created_at >= month_start
-            ).count()
+            stats = await get_statistics(db, user_id)
             
             stats_text = (
                 f"📊 Ваша статистика заявок\n\n"
-                f"📈 Всего ваших заявок: {user_total}\n\n"
-                f"📅 За сегодня: {user_today}\n"
-                f"📅 За неделю: {user_week}\n"
-                f"📅 За месяц: {user_month}"
+                f"📈 Всего ваших заявок: {stats['total']}\n\n"
+                f"📅 За сегодня: {stats['today']}\n"
+                f"📅 За неделю: {stats['week']}\n"
+                f"📅 За месяц: {stats['month']}"
             )
         
         await message.answer(stats_text, reply_markup=get_main_keyboard())
@@ -209,23 +216,21 @@ async def show_statistics(message: Message):
     except Exception as e:
         await message.answer(f"❌ Ошибка при получении статистики: {e}")
     finally:
-        db.close()
+        await db.close()
 
 
 @router.callback_query(F.data.startswith("app_status_"))
-async def change_application_status(callback: CallbackQuery, bot: Bot):
+async def change_application_status(callback: CallbackQuery, outbox: OutboxWorker):
     """Изменение статуса заявки (только для админов)."""
     try:
         user_id = callback.from_user.id
-        is_admin = (user_id == Config.LEADER_ID or user_id == Config.MANAGER_ID)
-        
-        if not is_admin:
+        if not is_admin(user_id):
             await callback.answer("❌ У вас нет прав для изменения статуса заявок", show_alert=True)
             return
         
         parts = callback.data.split("_")
         application_id = int(parts[2])
-        new_status_str = parts[3]
+        new_status_str = "_".join(parts[3:])
         
         status_map = {
             'new': ApplicationStatus.NEW,
@@ -238,40 +243,442 @@ async def change_application_status(callback: CallbackQuery, bot: Bot):
             await callback.answer("❌ Неверный статус", show_alert=True)
             return
         
-        db = SessionLocal()
+        db = AsyncSessionLocal()
         try:
-            application = db.query(Application).filter(Application.id == application_id).first()
-            if not application:
+            old_status = await db.scalar(select(Application.status).where(Application.id == application_id))
+            if not old_status:
                 await callback.answer("❌ Заявка не найдена", show_alert=True)
                 return
             
-            old_status = application.status
-            application.status = new_status
-            db.commit()
+            if old_status == new_status:
+                await callback.answer(f"Заявка #{application_id} уже в этом статусе")
+                return
+            
+            applicant_id = await change_status(db, application_id, old_status, new_status)
+            if applicant_id is None:
+                await callback.answer(
+                    f"Статус заявки #{application_id} уже изменен другим администратором, обновите список",
+                    show_alert=True
+                )
+                return
             
-            status_names = {
-                ApplicationStatus.NEW: "Новая",
-                ApplicationStatus.IN_PROGRESS: "В работе",
-                ApplicationStatus.COMPLETED: "Завершена"
-            }
+            await enqueue_notification(
+                db,
+                f"status:{callback.id}",
+                applicant_id,
+                f"📢 Обновление статуса заявки #{application_id}\n\n"
+                f"Статус изменен: {STATUS_NAMES[old_status]} → {STATUS_NAMES[new_status]}"
+            )
+            await db.commit()
+            outbox.notify()
             
             await callback.answer(
-                f"✅ Статус заявки #{application_id} изменен на: {status_names[new_status]}",
+                f"✅ Статус заявки #{application_id} изменен на: {STATUS_NAMES[new_status]}",
                 show_alert=True
             )
-            
-            try:
-                notification = (
-                    f"📢 Обновление статуса заявки #{application_id}\n\n"
-                    f"Статус изменен: {status_names[old_status]} → {status_names[new_status]}"
-                )
-                await bot.send_message(application.user_id, notification)
-            except Exception as e:
-                print(f"Ошибка при отправке уведомления пользователю: {e}")
                 
         finally:
-            db.close()
+            await db.close()
             
     except Exception as e:
         await callback.answer(f"❌ Ошибка: {e}", show_alert=True)
 
+
+def parse_inbox_filters(args: str) -> dict:
+    """
+    Фильтры списка заявок из аргументов команды /inbox.
+    
+    Формат: status=new|in_progress|completed from=ДД.ММ.ГГГГ to=ДД.ММ.ГГГГ user=ID.
+    Даты хранятся в ISO-формате, чтобы фильтры сохранялись в данных FSM как JSON.
+    """
+    filters = {}
+    for token in args.split():
+        key, _, value = token.partition("=")
+        if key == "status":
+            filters['status'] = ApplicationStatus(value).value
+        elif key in ("from", "to"):
+            filters[f'date_{key}'] = datetime.strptime(value, "%d.%m.%Y").date().isoformat()
+        elif key == "user":
+            filters['user_id'] = int(value)
+        else:
+            raise ValueError(f"неизвестный фильтр {token}")
+    return filters
+
+
+def describe_inbox_filters(filters: dict) -> str:
+    """Описание активных фильтров списка заявок."""
+    parts = []
+    if filters.get('status'):
+        parts.append(f"статус: {STATUS_NAMES[ApplicationStatus(filters['status'])]}")
+    if filters.get('date_from'):
+        parts.append(f"с {datetime.fromisoformat(filters['date_from']).strftime('%d.%m.%Y')}")
+    if filters.get('date_to'):
+        parts.append(f"по {datetime.fromisoformat(filters['date_to']).strftime('%d.%m.%Y')}")
+    if filters.get('user_id'):
+        parts.append(f"пользователь {filters['user_id']}")
+    return ", ".join(parts) or "нет"
+
+
+def inbox_conditions(filters: dict) -> list:
+    """Условия отбора заявок по фильтрам списка."""
+    conditions = []
+    if filters.get('status'):
+        conditions.append(Application.status == ApplicationStatus(filters['status']))
+    if filters.get('user_id'):
+        conditions.append(Application.user_id == filters['user_id'])
+    
+    # Границы сдвинуты на микросекунду: даты, записанные func.now(), хранятся в SQLite
+    # без дробной части и иначе при сравнении строк выпадали бы ровно на полуночи
+    if filters.get('date_from'):
+        date_from = datetime.fromisoformat(filters['date_from'])
+        conditions.append(Application.created_at > date_from - timedelta(microseconds=1))
+    if filters.get('date_to'):
+        date_to = datetime.fromisoformat(filters['date_to']) + timedelta(days=1)
+        conditions.append(Application.created_at < date_to - timedelta(microseconds=1))
+    return conditions
+
+
+async def fetch_applications_page(
+    db: AsyncSession,
+    filters: dict,
+    cursor: int | None = None,
+    backward: bool = False
+) -> tuple[list[Application], bool]:
+    """
+    Страница заявок по курсору (created_at, id) и признак продолжения в сторону выборки.
+    
+    Фильтр по пользователю идет по индексу (user_id, created_at, id), фильтр
+    по статусу - по индексу (status, created_at, id), поэтому стоимость
+    страницы не зависит от ее глубины и размера таблицы.
+    """
+    query = select(Application).where(*inbox_conditions(filters))
+    
+    key = tuple_(Application.created_at, Application.id)
+    if cursor is not None:
+        boundary = select(Application.created_at, Application.id).where(Application.id == cursor).scalar_subquery()
+        query = query.where(key > boundary if backward else key < boundary)
+    
+    if backward:
+        query = query.order_by(Application.created_at.asc(), Application.id.asc())
+    else:
+        query = query.order_by(Application.created_at.desc(), Application.id.desc())
+    
+    applications = list((await db.scalars(query.limit(APPLICATIONS_PER_PAGE + 1))).all())
+    has_more = len(applications) > APPLICATIONS_PER_PAGE
+    applications = applications[:APPLICATIONS_PER_PAGE]
+    if backward:
+        applications.reverse()
+    return applications, has_more
+
+
+async def count_bulk_candidates(db: AsyncSession, filters: dict, new_status: ApplicationStatus, limit: int) -> int:
+    """Число заявок по фильтрам, статус которых изменится (считается не дальше limit + 1)."""
+    candidates = (
+        select(Application.id)
+        .where(*inbox_conditions(filters), Application.status != new_status)
+        .limit(limit + 1)
+        .subquery()
+    )
+    return await db.scalar(select(func.count()).select_from(candidates))
+
+
+async def change_status(
+    db: AsyncSession,
+    application_id: int,
+    old_status: ApplicationStatus,
+    new_status: ApplicationStatus
+) -> int | None:
+    """
+    Смена статуса одной заявки в текущей транзакции, если она все еще в статусе old_status.
+    
+    Условный UPDATE ... RETURNING: из одновременных нажатий одной кнопки
+    строку меняет только первое, и только оно переносит счетчики статистики.
+    Возвращает ID пользователя или None, если статус уже изменен.
+    """
+    table = Application.__table__
+    row = (await db.execute(
+        update(table)
+        .where(table.c.id == application_id, table.c.status == old_status)
+        .values(status=new_status)
+        .returning(table.c.user_id, table.c.created_at)
+    )).first()
+    if row is None:
+        return None
+    
+    user_id, created_at = row
+    deltas: StatsDeltas = {}
+    add_stats_delta(deltas, user_id, created_at, old_status, -1)
+    add_stats_delta(deltas, user_id, created_at, new_status, 1)
+    await apply_stats_deltas(db, deltas)
+    return user_id
+
+
+async def bulk_change_status(
+    db: AsyncSession,
+    filters: dict,
+    new_status: ApplicationStatus
+) -> list[tuple[int, int, ApplicationStatus]]:
+    """
+    Смена статуса всех заявок по фильтрам в текущей транзакции.
+    
+    На каждый прежний статус выполняется один UPDATE ... RETURNING, поэтому
+    прежний статус каждой строки известен точно, а счетчики статистики
+    переносятся одним пакетом. Возвращает (ID заявки, ID пользователя, прежний статус).
+    """
+    table = Application.__table__
+    changed = []
+    deltas: StatsDeltas = {}
+    
+    for old_status in ApplicationStatus:
+        if old_status == new_status or filters.get('status') not in (None, old_status.value):
+            continue
+        result = await db.execute(
+            update(table)
+            .where(*inbox_conditions(filters), table.c.status == old_status)
+            .values(status=new_status)
+            .returning(table.c.id, table.c.user_id, table.c.created_at)
+        )
+        for application_id, user_id, created_at in result:
+            add_stats_delta(deltas, user_id, created_at, old_status, -1)
+            add_stats_delta(deltas, user_id, created_at, new_status, 1)
+            changed.append((application_id, user_id, old_status))
+    
+    await apply_stats_deltas(db, deltas)
+    return changed
+
+
+def bulk_notifications(
+    operation: str,
+    changed: list[tuple[int, int, ApplicationStatus]],
+    new_status: ApplicationStatus
+) -> list[tuple[str, int, str]]:
+    """Уведомления заявителям о массовой смене статуса: одно сообщение на пользователя."""
+    lines: dict[int, list[str]] = {}
+    for application_id, user_id, old_status in sorted(changed):
+        lines.setdefault(user_id, []).append(
+            f"#{application_id}: {STATUS_NAMES[old_status]} → {STATUS_NAMES[new_status]}"
+        )
+    return [
+        (
+            f"bulk:{operation}:{user_id}",
+            user_id,
+            "📢 Обновление статуса заявок\n\n" + "\n".join(user_lines)
+        )
+        for user_id, user_lines in lines.items()
+    ]
+
+
+def format_application_line(application: Application) -> str:
+    """Краткое описание заявки для списка."""
+    description = application.task_description
+    if len(description) > 100:
+        description = description[:100] + "..."
+    return (
+        f"{STATUS_ICONS[application.status]} #{application.id} • "
+        f"{STATUS_NAMES[application.status]} • {application.created_at.strftime('%d.%m.%Y %H:%M')}\n"
+        f"👤 {html.quote(application.user_name)} (ID {application.user_id})\n"
+        f"📝 {html.quote(description)}"
+    )
+
+
+async def show_inbox(
+    message: Message,
+    filters: dict,
+    page: int = 0,
+    cursor: int | None = None,
+    backward: bool = False
+):
+    """Отображение страницы списка заявок с учетом фильтров."""
+    async with AsyncSessionLocal() as db:
+        applications, has_more = await fetch_applications_page(db, filters, cursor, backward)
+    
+    if not applications and cursor is None:
+        await message.answer(
+            f"📥 Заявок не найдено.\nФильтры: {describe_inbox_filters(filters)}",
+            reply_markup=get_inbox_keyboard(status=filters.get('status'))
+        )
+        return
+    
+    if not applications:
+        await message.answer("Заявок на этой странице нет.")
+        return
+    
+    if backward:
+        has_prev, has_next = has_more, True
+        if not has_more:
+            page = 0
+    else:
+        has_prev, has_next = cursor is not None, has_more
+    
+    response_text = "📥 Заявки\n\n"
+    response_text += f"Фильтры: {describe_inbox_filters(filters)}\n"
+    response_text += f"Страница {page + 1}\n\n"
+    response_text += "─" * 30 + "\n\n"
+    
+    for application in applications:
+        response_text += format_application_line(application) + "\n\n"
+    
+    await message.answer(
+        response_text,
+        reply_markup=get_inbox_keyboard(
+            page,
+            filters.get('status'),
+            [application.id for application in applications],
+            prev_cursor=applications[0].id if has_prev else None,
+            next_cursor=applications[-1].id if has_next else None
+        )
+    )
+
+
+@router.message(Command("inbox"))
+async def cmd_inbox(message: Message, command: CommandObject, state: FSMContext):
+    """Обработчик команды /inbox - список заявок с фильтрами (только для админов)."""
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ Список заявок доступен только руководителю и менеджеру.")
+        return
+    
+    args = (command.args or "").strip()
+    if args == "reset":
+        filters = {}
+    elif args:
+        try:
+            filters = parse_inbox_filters(args)
+        except ValueError as e:
+            await message.answer(
+                f"❌ Неверный фильтр: {e}\n\n"
+                "Формат: /inbox status=new from=01.10.2024 to=31.10.2024 user=123456789\n"
+                "Сброс фильтров: /inbox reset"
+            )
+            return
+    else:
+        filters = (await state.get_data()).get('inbox_filters', {})
+    
+    await state.update_data(inbox_filters=filters)
+    try:
+        await show_inbox(message, filters)
+    except Exception as e:
+        await message.answer(f"❌ Ошибка при получении заявок: {e}")
+
+
+@router.callback_query(F.data.startswith("inbox_"))
+async def inbox_callback(callback: CallbackQuery, state: FSMContext, outbox: OutboxWorker):
+    """
+    Действия со списком заявок: inbox_page_{страница}_{p|n}_{ID}, inbox_status_{статус},
+    inbox_app_{ID} и массовая смена статуса inbox_bulk_{статус} с подтверждением inbox_bulkok.
+    """
+    if not is_admin(callback.from_user.id):
+        await callback.answer("❌ Список заявок доступен только руководителю и менеджеру.", show_alert=True)
+        return
+    
+    try:
+        action, _, value = callback.data.removeprefix("inbox_").partition("_")
+        filters = (await state.get_data()).get('inbox_filters', {})
+        
+        if action == "app":
+            async with AsyncSessionLocal() as db:
+                application = await db.get(Application, int(value))
+            if not application:
+                await callback.answer("❌ Заявка не найдена", show_alert=True)
+                return
+            await callback.answer()
+            if callback.message:
+                await callback.message.answer(
+                    f"📋 Заявка #{application.id}\n\n"
+                    f"👤 Имя: {html.quote(application.user_name)}\n"
+                    f"📞 Контакт: {html.quote(application.contact)}\n"
+                    f"📝 Описание задачи:\n{html.quote(application.task_description)}\n\n"
+                    f"📅 Создана: {application.created_at.strftime('%d.%m.%Y %H:%M')}\n"
+                    f"🆔 ID пользователя: {application.user_id}\n"
+                    f"📊 Статус: {STATUS_NAMES[application.status]}",
+                    reply_markup=get_application_status_keyboard(application.id)
+                )
+            return
+        
+        if action in ("bulk", "bulkok", "bulkno"):
+            await bulk_status_action(callback, state, outbox, action, value, filters)
+            return
+        
+        if action == "status":
+            filters = {key: item for key, item in filters.items() if key != 'status'}
+            if value != "all":
+                filters['status'] = ApplicationStatus(value).value
+            await state.update_data(inbox_filters=filters)
+            page, cursor, backward = 0, None, False
+        else:
+            page_token, direction, cursor_token = value.split("_")
+            page, cursor, backward = int(page_token), int(cursor_token), direction == "p"
+        
+        await callback.answer()
+        if callback.message:
+            await show_inbox(callback.message, filters, page=page, cursor=cursor, backward=backward)
+    except Exception as e:
+        await callback.answer(f"Ошибка: {e}", show_alert=True)
+
+
+async def bulk_status_action(
+    callback: CallbackQuery,
+    state: FSMContext,
+    outbox: OutboxWorker,
+    action: str,
+    value: str,
+    filters: dict
+):
+    """
+    Массовая смена статуса заявок по фильтрам списка.
+    
+    inbox_bulk_{статус} запоминает операцию в данных FSM и просит подтверждения,
+    inbox_bulkok выполняет ее в одной транзакции, inbox_bulkno отменяет.
+    """
+    if action == "bulkno":
+        await state.update_data(inbox_bulk=None)
+        await callback.answer("Массовое изменение отменено")
+        return
+    
+    if action == "bulk":
+        new_status = ApplicationStatus(value)
+        async with AsyncSessionLocal() as db:
+            count = await count_bulk_candidates(db, filters, new_status, Config.BULK_STATUS_LIMIT)
+        if not count:
+            await callback.answer("Нет заявок, статус которых изменится", show_alert=True)
+            return
+        if count > Config.BULK_STATUS_LIMIT:
+            await callback.answer(
+                f"Под фильтры попадает больше {Config.BULK_STATUS_LIMIT} заявок, уточните фильтры",
+                show_alert=True
+            )
+            return
+        
+        await state.update_data(inbox_bulk={'status': new_status.value, 'filters': filters})
+        await callback.answer()
+        if callback.message:
+            await callback.message.answer(
+                f"⚠️ Изменить статус {count} заявок на «{STATUS_NAMES[new_status]}»?\n"
+                f"Фильтры: {describe_inbox_filters(filters)}",
+                reply_markup=get_bulk_confirm_keyboard()
+            )
+        return
+    
+    pending = (await state.get_data()).get('inbox_bulk')
+    if not pending:
+        await callback.answer("Операция устарела, выберите ее в /inbox еще раз", show_alert=True)
+        return
+    await state.update_data(inbox_bulk=None)
+    
+    new_status = ApplicationStatus(pending['status'])
+    async with AsyncSessionLocal() as db:
+        count = await count_bulk_candidates(db, pending['filters'], new_status, Config.BULK_STATUS_LIMIT)
+        if count > Config.BULK_STATUS_LIMIT:
+            await callback.answer(
+                f"Под фильтры уже попадает больше {Config.BULK_STATUS_LIMIT} заявок, уточните фильтры",
+                show_alert=True
+            )
+            return
+        changed = await bulk_change_status(db, pending['filters'], new_status)
+        await enqueue_notifications(db, bulk_notifications(callback.id, changed, new_status))
+        await db.commit()
+    outbox.notify()
+    
+    await callback.answer(
+        f"✅ Статус {len(changed)} заявок изменен на: {STATUS_NAMES[new_status]}",
+        show_alert=True
+    )
@@ -3,8 +3,11 @@ from aiogram import Router, F
 from aiogram.types import Message
 from aiogram.filters import Command
 from src.bot.keyboards import get_main_keyboard
+from src.bot.throttling import ThrottleLimit
+from src.config import Config
 
 router = Router()
+throttling = ThrottleLimit(*Config.THROTTLE_COMMANDS)
 
 
 @router.message(Command("start"))
@@ -34,7 +37,9 @@ async def cmd_help(message: Message):
         "/start - Начать работу с ботом\n"
         "/help - Показать эту справку\n"
         "/posts - Просмотреть посты из канала\n"
-        "/stats - Статистика заявок\n\n"
+        "/search <запрос> - Поиск по постам\n"
+        "/stats - Статистика заявок\n"
+        "/inbox - Список заявок с фильтрами (для руководителя и менеджера)\n\n"
         "Действия:\n"
         "• Нажмите '📋 Создать заявку' для подачи новой заявки\n"
         "• Нажмите '📰 Просмотреть посты' для просмотра новостей команды\n"
@@ -54,7 +59,7 @@ async def cmd_posts(message: Message):
     await show_posts(message)
 
 
-@router.message(Command("stats"))
+@router.message(Command("stats"), flags={"throttling": ThrottleLimit(*Config.THROTTLE_STATISTICS)})
 async def cmd_stats(message: Message):
     """Обработчик команды /stats - перенаправляет на обработчик статистики."""
     from src.bot.handlers.applications import show_statistics
@@ -1,14 +1,22 @@
 """Обработчики для отображения постов из канала."""
-from aiogram import Router, F
+import time
+from aiogram import Router, F, html
+from aiogram.filters import Command, CommandObject
+from aiogram.fsm.context import FSMContext
 from aiogram.types import Message, CallbackQuery
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from src.database.db import SessionLocal
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.db import AsyncSessionLocal
 from src.database.models import Post
-from src.bot.keyboards import get_posts_keyboard
+from src.database.search import search_posts
+from src.bot.keyboards import get_posts_keyboard, get_search_keyboard
+from src.config import Config
+from src.utils.cache import feed_pages, feed_counts
 from datetime import datetime
+from src.bot.throttling import ThrottleLimit
 
 router = Router()
+throttling = ThrottleLimit(*Config.THROTTLE_POSTS)
 
 POSTS_PER_PAGE = 5
 
@@ -17,6 +25,9 @@ def format_post(post: Post) -> str:
     """Форматирование поста для отображения."""
     text = f"📰 Пост #{post.message_id}\n\n"
     
+    if len(Config.CHANNEL_IDS) > 1:
+        text += f"📢 Канал: {post.channel_id}\n"
+    
     if post.service_type:
         text += f"🏷 Тип услуги/проекта: {post.service_type}\n"
     
@@ -33,30 +44,104 @@ def format_post(post: Post) -> str:
     return text
 
 
+def parse_channel_token(token: str) -> int | None:
+    """Индекс канала из callback data ("all" - все каналы)."""
+    if token == "all" or not token.isdigit() or int(token) >= len(Config.CHANNEL_IDS):
+        return None
+    return int(token)
+
+
+async def count_posts(db: AsyncSession, channel_index: int | None = None) -> int:
+    """Количество постов с кэшированием на POSTS_COUNT_TTL секунд."""
+    now = time.monotonic()
+    cached = feed_counts.get(channel_index)
+    if cached and now - cached[0] < Config.POSTS_COUNT_TTL:
+        return cached[1]
+    
+    query = select(func.count(Post.id)).where(Post.deleted_at.is_(None))
+    if channel_index is not None:
+        query = query.where(Post.channel_id == Config.CHANNEL_IDS[channel_index])
+    
+    total = await db.scalar(query)
+    feed_counts[channel_index] = (now, total)
+    return total
+
+
+async def fetch_posts_page(
+    db: AsyncSession,
+    channel_index: int | None = None,
+    cursor: int | None = None,
+    backward: bool = False
+) -> tuple[list[Post], bool]:
+    """
+    Страница постов по курсору (created_at, id) и признак продолжения в сторону выборки.
+    
+    Значения created_at берутся из строки поста-курсора, поэтому сравнение не
+    зависит от формата хранения даты, а выборка идет по индексу с любой глубины.
+    """
+    query = select(Post).where(Post.deleted_at.is_(None))
+    if channel_index is not None:
+        query = query.where(Post.channel_id == Config.CHANNEL_IDS[channel_index])
+    
+    key = tuple_(Post.created_at, Post.id)
+    if cursor is not None:
+        boundary = select(Post.created_at, Post.id).where(Post.id == cursor).scalar_subquery()
+        query = query.where(key > boundary if backward else key < boundary)
+    
+    if backward:
+        query = query.order_by(Post.created_at.asc(), Post.id.asc())
+    else:
+        query = query.order_by(Post.created_at.desc(), Post.id.desc())
+    
+    posts = list((await db.scalars(query.limit(POSTS_PER_PAGE + 1))).all())
+    has_more = len(posts) > POSTS_PER_PAGE
+    posts = posts[:POSTS_PER_PAGE]
+    if backward:
+        posts.reverse()
+    return posts, has_more
+
+
 @router.message(F.text == "📰 Просмотреть посты")
-async def show_posts(message: Message, page: int = 0):
-    """Отображение списка постов."""
-    db = SessionLocal()
+async def show_posts(
+    message: Message,
+    page: int = 0,
+    channel_index: int | None = None,
+    cursor: int | None = None,
+    backward: bool = False
+):
+    """Отображение списка постов; отрисованные страницы берутся из кэша ленты."""
+    cache_key = (channel_index, page, cursor, backward)
+    cached = feed_pages.get(cache_key)
+    if cached is not None:
+        response_text, keyboard = cached
+        await message.answer(response_text, reply_markup=keyboard)
+        return
+    
+    db = AsyncSessionLocal()
     try:
-        total_posts = db.query(Post).count()
+        posts, has_more = await fetch_posts_page(db, channel_index, cursor, backward)
         
-        if total_posts == 0:
+        if not posts and cursor is None:
             await message.answer(
                 "📭 Пока нет сохраненных постов из канала.\n"
                 "Посты будут появляться здесь автоматически после публикации в канале."
             )
             return
         
-        total_pages = (total_posts + POSTS_PER_PAGE - 1) // POSTS_PER_PAGE
-        
-        posts = db.query(Post).order_by(desc(Post.created_at)).offset(
-            page * POSTS_PER_PAGE
-        ).limit(POSTS_PER_PAGE).all()
-        
         if not posts:
             await message.answer("Постов на этой странице нет.")
             return
         
+        if backward:
+            has_prev, has_next = has_more, True
+            if not has_more:
+                page = 0
+        else:
+            has_prev, has_next = cursor is not None, has_more
+        
+        total_posts = await count_posts(db, channel_index)
+        total_pages = max((total_posts + POSTS_PER_PAGE - 1) // POSTS_PER_PAGE, page + 1)
+        
         response_text = f"📰 Посты из канала команды\n\n"
         response_text += f"Страница {page + 1} из {total_pages}\n"
         response_text += f"Всего постов: {total_posts}\n\n"
@@ -66,33 +151,123 @@ async def show_posts(message: Message, page: int = 0):
             response_text += format_post(post) + "\n\n"
             response_text += "─" * 30 + "\n\n"
         
-        await message.answer(
-            response_text,
-            reply_markup=get_posts_keyboard(page, total_pages)
+        keyboard = get_posts_keyboard(
+            page,
+            channel_index,
+            prev_cursor=posts[0].id if has_prev else None,
+            next_cursor=posts[-1].id if has_next else None
         )
-        
+        feed_pages.set(cache_key, (response_text, keyboard))
+        await message.answer(response_text, reply_markup=keyboard)
+    
     except Exception as e:
         await message.answer(f"❌ Ошибка при получении постов: {e}")
     finally:
-        db.close()
+        await db.close()
 
 
 @router.callback_query(F.data.startswith("posts_page_"))
 async def posts_pagination(callback: CallbackQuery):
-    """Обработка пагинации постов."""
+    """Обработка пагинации постов: posts_page_{канал}_{страница}_{p|n}_{ID поста}."""
     try:
-        page = int(callback.data.split("_")[-1])
+        parts = callback.data.split("_")
+        channel_index = parse_channel_token(parts[2]) if len(parts) > 3 else None
+        if len(parts) == 6:
+            page, direction, cursor = int(parts[3]), parts[4], int(parts[5])
+        else:
+            # Кнопки старого формата со смещением - возврат к первой странице
+            page, direction, cursor = 0, "n", None
         await callback.answer()
         if callback.message:
-            await show_posts(callback.message, page=page)
+            await show_posts(
+                callback.message,
+                page=page,
+                channel_index=channel_index,
+                cursor=cursor,
+                backward=direction == "p"
+            )
     except Exception as e:
         await callback.answer(f"Ошибка: {e}", show_alert=True)
 
 
-@router.callback_query(F.data == "posts_refresh")
+@router.callback_query(F.data.startswith("posts_refresh"))
 async def posts_refresh(callback: CallbackQuery):
     """Обновление списка постов."""
     await callback.answer("Обновление...")
+    channel_index = parse_channel_token(callback.data.split("_")[-1])
+    if callback.message:
+        await show_posts(callback.message, page=0, channel_index=channel_index)
+
+
+@router.callback_query(F.data.startswith("posts_channel_"))
+async def posts_channel(callback: CallbackQuery):
+    """Фильтрация постов по каналу."""
+    await callback.answer()
+    channel_index = parse_channel_token(callback.data.split("_")[-1])
     if callback.message:
-        await show_posts(callback.message, page=0)
+        await show_posts(callback.message, page=0, channel_index=channel_index)
+
 
+
+async def show_search_results(message: Message, query: str, page: int = 0):
+    """Отображение страницы результатов поиска по постам."""
+    async with AsyncSessionLocal() as db:
+        posts = await search_posts(
+            db, query, limit=POSTS_PER_PAGE + 1, offset=page * POSTS_PER_PAGE
+        )
+    
+    if not posts:
+        await message.answer(
+            f"🔍 По запросу «{html.quote(query)}» ничего не найдено." if page == 0
+            else "Результатов на этой странице нет."
+        )
+        return
+    
+    has_next = len(posts) > POSTS_PER_PAGE
+    
+    response_text = f"🔍 Результаты поиска: «{html.quote(query)}»\n\n"
+    response_text += f"Страница {page + 1}\n\n"
+    response_text += "─" * 30 + "\n\n"
+    
+    for post in posts[:POSTS_PER_PAGE]:
+        response_text += format_post(post) + "\n\n"
+        response_text += "─" * 30 + "\n\n"
+    
+    await message.answer(
+        response_text,
+        reply_markup=get_search_keyboard(page, has_next)
+    )
+
+
+@router.message(Command("search"))
+async def cmd_search(message: Message, command: CommandObject, state: FSMContext):
+    """Обработчик команды /search - полнотекстовый поиск по постам."""
+    query = (command.args or "").strip()
+    if not query:
+        await message.answer(
+            "🔍 Укажите запрос после команды, например:\n"
+            "/search лендинг"
+        )
+        return
+    
+    await state.update_data(search_query=query)
+    try:
+        await show_search_results(message, query)
+    except Exception as e:
+        await message.answer(f"❌ Ошибка при поиске постов: {e}")
+
+
+@router.callback_query(F.data.startswith("search_page_"))
+async def search_pagination(callback: CallbackQuery, state: FSMContext):
+    """Обработка пагинации результатов поиска."""
+    try:
+        page = int(callback.data.split("_")[-1])
+        query = (await state.get_data()).get('search_query')
+        if not query:
+            await callback.answer("Поиск устарел, выполните /search еще раз", show_alert=True)
+            return
+        await callback.answer()
+        if callback.message:
+            await show_search_results(callback.message, query, page=page)
+    except Exception as e:
+        await callback.answer(f"Ошибка: {e}", show_alert=True)
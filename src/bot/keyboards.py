@@ -1,6 +1,7 @@
 """Клавиатуры для Telegram-бота."""
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import ReplyKeyboardBuilder, InlineKeyboardBuilder
+from src.config import Config
 from src.database.models import ApplicationStatus
 
 
@@ -22,18 +23,59 @@ def get_cancel_keyboard() -> ReplyKeyboardMarkup:
     return builder.as_markup(resize_keyboard=True)
 
 
-def get_posts_keyboard(page: int = 0, total_pages: int = 1) -> InlineKeyboardMarkup:
-    """Клавиатура для навигации по постам."""
+def get_posts_keyboard(
+    page: int = 0,
+    channel_index: int | None = None,
+    prev_cursor: int | None = None,
+    next_cursor: int | None = None
+) -> InlineKeyboardMarkup:
+    """
+    Клавиатура для навигации по постам с фильтром по каналу.
+    
+    Курсор - ID первого (для "Назад") или последнего (для "Вперед") поста
+    текущей страницы: posts_page_{канал}_{страница}_{p|n}_{ID поста}.
+    """
     builder = InlineKeyboardBuilder()
+    channel_token = "all" if channel_index is None else channel_index
+    
+    if prev_cursor is not None:
+        builder.add(InlineKeyboardButton(
+            text="◀️ Назад",
+            callback_data=f"posts_page_{channel_token}_{max(page - 1, 0)}_p_{prev_cursor}"
+        ))
+    if next_cursor is not None:
+        builder.add(InlineKeyboardButton(
+            text="Вперед ▶️",
+            callback_data=f"posts_page_{channel_token}_{page + 1}_n_{next_cursor}"
+        ))
+    builder.adjust(2)
     
-    if total_pages > 1:
-        if page > 0:
-            builder.add(InlineKeyboardButton(text="◀️ Назад", callback_data=f"posts_page_{page-1}"))
-        if page < total_pages - 1:
-            builder.add(InlineKeyboardButton(text="Вперед ▶️", callback_data=f"posts_page_{page+1}"))
-        builder.adjust(2)
+    builder.add(InlineKeyboardButton(text="🔄 Обновить", callback_data=f"posts_refresh_{channel_token}"))
     
-    builder.add(InlineKeyboardButton(text="🔄 Обновить", callback_data="posts_refresh"))
+    if len(Config.CHANNEL_IDS) > 1:
+        channel_buttons = [InlineKeyboardButton(
+            text=("✅ " if channel_index is None else "") + "Все каналы",
+            callback_data="posts_channel_all"
+        )]
+        for index, channel in enumerate(Config.CHANNEL_IDS):
+            channel_buttons.append(InlineKeyboardButton(
+                text=("✅ " if index == channel_index else "") + channel,
+                callback_data=f"posts_channel_{index}"
+            ))
+        builder.row(*channel_buttons, width=3)
+    
+    return builder.as_markup()
+
+
+def get_search_keyboard(page: int = 0, has_next: bool = False) -> InlineKeyboardMarkup:
+    """Клавиатура для навигации по результатам поиска."""
+    builder = InlineKeyboardBuilder()
+    
+    if page > 0:
+        builder.add(InlineKeyboardButton(text="◀️ Назад", callback_data=f"search_page_{page-1}"))
+    if has_next:
+        builder.add(InlineKeyboardButton(text="Вперед ▶️", callback_data=f"search_page_{page+1}"))
+    builder.adjust(2)
     
     return builder.as_markup()
 
@@ -58,3 +100,75 @@ def get_application_status_keyboard(application_id: int) -> InlineKeyboardMarkup
     
     return builder.as_markup()
 
+
+def get_inbox_keyboard(
+    page: int = 0,
+    status: str | None = None,
+    application_ids: list[int] | None = None,
+    prev_cursor: int | None = None,
+    next_cursor: int | None = None
+) -> InlineKeyboardMarkup:
+    """
+    Клавиатура списка заявок: открытие заявки, навигация, фильтр по статусу
+    и массовая смена статуса всех заявок по текущим фильтрам.
+    
+    Курсор - ID первой (для "Назад") или последней (для "Вперед") заявки
+    текущей страницы: inbox_page_{страница}_{p|n}_{ID заявки}.
+    """
+    builder = InlineKeyboardBuilder()
+    
+    application_buttons = [
+        InlineKeyboardButton(text=f"#{application_id}", callback_data=f"inbox_app_{application_id}")
+        for application_id in application_ids or []
+    ]
+    if application_buttons:
+        builder.row(*application_buttons, width=5)
+    
+    navigation = []
+    if prev_cursor is not None:
+        navigation.append(InlineKeyboardButton(
+            text="◀️ Назад",
+            callback_data=f"inbox_page_{max(page - 1, 0)}_p_{prev_cursor}"
+        ))
+    if next_cursor is not None:
+        navigation.append(InlineKeyboardButton(
+            text="Вперед ▶️",
+            callback_data=f"inbox_page_{page + 1}_n_{next_cursor}"
+        ))
+    if navigation:
+        builder.row(*navigation)
+    
+    status_buttons = [InlineKeyboardButton(
+        text=("✅ " if status is None else "") + "Все",
+        callback_data="inbox_status_all"
+    )]
+    for value, name in (
+        (ApplicationStatus.NEW.value, "Новые"),
+        (ApplicationStatus.IN_PROGRESS.value, "В работе"),
+        (ApplicationStatus.COMPLETED.value, "Завершены"),
+    ):
+        status_buttons.append(InlineKeyboardButton(
+            text=("✅ " if status == value else "") + name,
+            callback_data=f"inbox_status_{value}"
+        ))
+    builder.row(*status_buttons, width=4)
+    
+    if application_ids:
+        builder.row(*(
+            InlineKeyboardButton(text=f"Все → {icon}", callback_data=f"inbox_bulk_{status_value}")
+            for status_value, icon in (
+                (ApplicationStatus.NEW.value, "🆕"),
+                (ApplicationStatus.IN_PROGRESS.value, "⚙️"),
+                (ApplicationStatus.COMPLETED.value, "✅"),
+            )
+        ))
+    
+    return builder.as_markup()
+
+
+def get_bulk_confirm_keyboard() -> InlineKeyboardMarkup:
+    """Подтверждение массовой смены статуса заявок."""
+    builder = InlineKeyboardBuilder()
+    builder.add(InlineKeyboardButton(text="✅ Подтвердить", callback_data="inbox_bulkok"))
+    builder.add(InlineKeyboardButton(text="❌ Отмена", callback_data="inbox_bulkno"))
+    return builder.as_markup()
@@ -0,0 +1,52 @@
+"""Метрики обработки обновлений бота."""
+import time
+from typing import Any, Awaitable, Callable
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.types import TelegramObject
+from src.bot.sender import MessageSender
+from src.utils.metrics import HANDLER_DURATION, UPDATES_IN_PROGRESS, SENDER_QUEUE
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Время выполнения обработчика с меткой его имени и результата (ok или error)."""
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any]
+    ) -> Any:
+        name = data['handler'].callback.__name__
+        started = time.perf_counter()
+        status = 'error'
+        try:
+            result = await handler(event, data)
+            status = 'ok'
+            return result
+        finally:
+            HANDLER_DURATION.labels(name, status).observe(time.perf_counter() - started)
+
+
+class UpdatesInProgressMiddleware(BaseMiddleware):
+    """Количество обновлений, которые диспетчер обрабатывает в данный момент."""
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any]
+    ) -> Any:
+        UPDATES_IN_PROGRESS.inc()
+        try:
+            return await handler(event, data)
+        finally:
+            UPDATES_IN_PROGRESS.dec()
+
+
+def setup_bot_metrics(dp: Dispatcher, sender: MessageSender):
+    """Подключение метрик к диспетчеру; внутренние middleware регистрируются после ограничения частоты."""
+    dp.update.outer_middleware(UpdatesInProgressMiddleware())
+    handler_metrics = HandlerMetricsMiddleware()
+    dp.message.middleware(handler_metrics)
+    dp.callback_query.middleware(handler_metrics)
+    SENDER_QUEUE.set_function(lambda: sender.pending)
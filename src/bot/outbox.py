@@ -0,0 +1,117 @@
+"""Фоновая доставка уведомлений из outbox."""
+import asyncio
+from datetime import timedelta
+from src.bot.sender import MessageSender
+from src.config import Config
+from src.database.db import AsyncSessionLocal
+from src.database.outbox import claim_outbox_batch, discard_exhausted_outbox, mark_outbox_sent, purge_outbox
+from src.utils.metrics import OUTBOX_FAILED
+
+
+class OutboxWorker:
+    """
+    Доставка уведомлений из outbox пакетами с гарантией "хотя бы один раз".
+    
+    Пакет захватывается на OUTBOX_LEASE секунд, отправляется через
+    MessageSender, и только подтвержденные Telegram записи отмечаются
+    отправленными. Неподтвержденные (в том числе при падении процесса)
+    снова становятся доступны после истечения аренды. Уведомление, не
+    доставленное за OUTBOX_MAX_ATTEMPTS попыток, удаляется с предупреждением
+    и учитывается в метрике bot_outbox_failed_total.
+    """
+    
+    def __init__(self, sender: MessageSender, batch_size: int | None = None, poll_interval: float | None = None):
+        self.sender = sender
+        self.batch_size = batch_size or Config.OUTBOX_BATCH_SIZE
+        self.poll_interval = poll_interval or Config.OUTBOX_POLL_INTERVAL
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: asyncio.Task | None = None
+    
+    def notify(self):
+        """Сигнал о новых записях в outbox (после коммита транзакции)."""
+        self._wakeup.set()
+    
+    async def start(self):
+        """Удаление старых отправленных и исчерпавших попытки записей и запуск фоновой доставки."""
+        if self._task is not None:
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                purged = await purge_outbox(db, timedelta(days=Config.OUTBOX_RETENTION_DAYS))
+                discarded = await discard_exhausted_outbox(db, Config.OUTBOX_MAX_ATTEMPTS)
+                await db.commit()
+            if purged:
+                print(f"Удалено отправленных уведомлений из outbox: {purged}")
+            self._report_discarded(discarded)
+        except Exception as e:
+            print(f"Ошибка при очистке outbox: {e}")
+        
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self, timeout: float = 10.0):
+        """Завершение текущего пакета (не дольше timeout секунд) и остановка доставки."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            print("Доставка outbox прервана, неотправленные уведомления будут доставлены после перезапуска")
+        self._task = None
+    
+    async def drain_once(self) -> int:
+        """Доставка одного пакета. Возвращает количество захваченных записей."""
+        async with AsyncSessionLocal() as db:
+            batch = await claim_outbox_batch(db, self.batch_size, Config.OUTBOX_LEASE, Config.OUTBOX_MAX_ATTEMPTS)
+            await db.commit()
+        
+        if not batch:
+            return 0
+        
+        results = await asyncio.gather(*(
+            self.sender.deliver(chat_id, text) for _, chat_id, text, _ in batch
+        ))
+        sent = [outbox_id for (outbox_id, _, _, _), delivered in zip(batch, results) if delivered]
+        exhausted = [
+            outbox_id for (outbox_id, _, _, attempts), delivered in zip(batch, results)
+            if not delivered and attempts >= Config.OUTBOX_MAX_ATTEMPTS
+        ]
+        
+        async with AsyncSessionLocal() as db:
+            await mark_outbox_sent(db, sent)
+            discarded = await discard_exhausted_outbox(db, Config.OUTBOX_MAX_ATTEMPTS, exhausted)
+            await db.commit()
+        
+        retrying = len(batch) - len(sent) - len(exhausted)
+        if retrying:
+            print(f"Не доставлено уведомлений из outbox: {retrying}, будет повтор")
+        self._report_discarded(discarded)
+        return len(batch)
+    
+    @staticmethod
+    def _report_discarded(keys: list[str]):
+        """Предупреждение об уведомлениях, удаленных после исчерпания попыток доставки."""
+        if keys:
+            OUTBOX_FAILED.inc(len(keys))
+            print(f"⚠️ Не доставлены за {Config.OUTBOX_MAX_ATTEMPTS} попыток и удалены из outbox уведомления: {', '.join(keys)}")
+    
+    async def _run(self):
+        """Доставка пакетов по сигналу или по таймеру."""
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                claimed = await self.drain_once()
+            except Exception as e:
+                print(f"Ошибка при доставке уведомлений из outbox: {e}")
+                claimed = 0
+            
+            if claimed >= self.batch_size:
+                continue
+            
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
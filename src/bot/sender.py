@@ -0,0 +1,187 @@
+"""Очередь исходящих сообщений бота с ограничением скорости отправки."""
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter, TelegramNetworkError, TelegramServerError, TelegramAPIError
+from src.config import Config
+
+
+MAX_CHAT_BUCKETS = 10000
+
+
+class TokenBucket:
+    """Маркерная корзина: rate маркеров в секунду, не более capacity накопленных."""
+    
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated', 'blocked_until')
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def pause(self, seconds: float):
+        """Запрет выдачи маркеров на seconds секунд (ответ Telegram retry_after)."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+    
+    async def acquire(self):
+        """Ожидание и получение одного маркера."""
+        while True:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                await asyncio.sleep(self.blocked_until - now)
+                continue
+            
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+@dataclass
+class OutgoingMessage:
+    """Сообщение в очереди отправки."""
+    chat_id: int
+    text: str
+    kwargs: dict = field(default_factory=dict)
+    attempt: int = 0
+    result: asyncio.Future | None = None
+
+
+class MessageSender:
+    """
+    Отправка сообщений бота через очередь и пул воркеров.
+    
+    Обработчики ставят сообщение в очередь методом send и сразу возвращаются.
+    Воркеры соблюдают общий лимит бота и лимиты отдельных чатов (личные чаты
+    и группы), при TelegramRetryAfter приостанавливают всю отправку на
+    указанное время (Telegram может ограничить бота целиком, а не один чат),
+    а сетевые ошибки и ошибки сервера повторяют с экспоненциальной задержкой.
+    """
+    
+    def __init__(
+        self,
+        bot: Bot,
+        workers: int | None = None,
+        global_rate: float | None = None,
+        chat_rate: float | None = None,
+        group_rate: float | None = None,
+        max_retries: int | None = None,
+        queue_size: int | None = None
+    ):
+        self.bot = bot
+        self.workers = workers or Config.SENDER_WORKERS
+        self.chat_rate = chat_rate or Config.SENDER_CHAT_RATE
+        self.group_rate = group_rate or Config.SENDER_GROUP_RATE
+        self.max_retries = Config.SENDER_MAX_RETRIES if max_retries is None else max_retries
+        global_rate = global_rate or Config.SENDER_GLOBAL_RATE
+        self._global = TokenBucket(global_rate, global_rate)
+        self._chats: OrderedDict[int, TokenBucket] = OrderedDict()
+        self._queue: asyncio.Queue[OutgoingMessage] = asyncio.Queue(queue_size or Config.SENDER_QUEUE_SIZE)
+        self._tasks: list[asyncio.Task] = []
+    
+    @property
+    def pending(self) -> int:
+        """Количество сообщений, ожидающих отправки."""
+        return self._queue.qsize()
+    
+    def send(self, chat_id: int, text: str, **kwargs) -> bool:
+        """Постановка сообщения в очередь. Возвращает False, если очередь переполнена."""
+        try:
+            self._queue.put_nowait(OutgoingMessage(chat_id, text, kwargs))
+        except asyncio.QueueFull:
+            print(f"Очередь отправки переполнена, сообщение в чат {chat_id} не отправлено")
+            return False
+        return True
+    
+    async def deliver(self, chat_id: int, text: str, **kwargs) -> bool:
+        """Отправка через очередь с ожиданием результата: True, если Telegram принял сообщение."""
+        item = OutgoingMessage(chat_id, text, kwargs, result=asyncio.get_running_loop().create_future())
+        await self._queue.put(item)
+        return await item.result
+    
+    async def start(self):
+        """Запуск воркеров отправки."""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+    
+    async def stop(self, timeout: float = 10.0):
+        """Отправка оставшихся сообщений (не дольше timeout секунд) и остановка воркеров."""
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                print(f"Не отправлено сообщений при остановке: {self._queue.qsize()}")
+        
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+    
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        """
+        Корзина чата: группы (отрицательный ID) ограничены сильнее личных чатов.
+        
+        Хранится не больше MAX_CHAT_BUCKETS корзин; при переполнении удаляется
+        корзина чата, в который дольше всех не отправляли сообщений.
+        """
+        bucket = self._chats.get(chat_id)
+        if bucket is not None:
+            self._chats.move_to_end(chat_id)
+            return bucket
+        
+        while len(self._chats) >= MAX_CHAT_BUCKETS:
+            self._chats.popitem(last=False)
+        bucket = TokenBucket(self.group_rate if chat_id < 0 else self.chat_rate, 1)
+        self._chats[chat_id] = bucket
+        return bucket
+    
+    async def _worker(self):
+        """Отправка сообщений из очереди."""
+        while True:
+            item = await self._queue.get()
+            delivered = False
+            try:
+                delivered = await self._deliver(item)
+            except Exception as e:
+                print(f"Ошибка при отправке сообщения в чат {item.chat_id}: {e}")
+            finally:
+                if item.result is not None and not item.result.done():
+                    item.result.set_result(delivered)
+                self._queue.task_done()
+    
+    async def _deliver(self, item: OutgoingMessage) -> bool:
+        """Отправка одного сообщения с повторами. Возвращает True при успешной отправке."""
+        bucket = self._chat_bucket(item.chat_id)
+        
+        while True:
+            await bucket.acquire()
+            await self._global.acquire()
+            try:
+                await self.bot.send_message(item.chat_id, item.text, **item.kwargs)
+                return True
+            except TelegramRetryAfter as e:
+                bucket.pause(e.retry_after)
+                self._global.pause(e.retry_after)
+                delay = 0
+            except (TelegramNetworkError, TelegramServerError) as e:
+                delay = min(Config.SENDER_RETRY_DELAY * 2 ** item.attempt, Config.SENDER_MAX_RETRY_DELAY)
+                print(f"Ошибка отправки в чат {item.chat_id}, повтор через {delay:.1f} сек: {e}")
+            except TelegramAPIError as e:
+                print(f"Сообщение в чат {item.chat_id} отклонено Telegram: {e}")
+                return False
+            
+            item.attempt += 1
+            if item.attempt > self.max_retries:
+                print(f"Сообщение в чат {item.chat_id} не отправлено после {self.max_retries} повторов")
+                return False
+            if delay:
+                await asyncio.sleep(delay)
@@ -0,0 +1,201 @@
+"""Хранилище состояний FSM в базе данных проекта."""
+import asyncio
+import json
+import time
+from typing import Any, Mapping
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StorageKey, StateType, KeyBuilder, DefaultKeyBuilder
+from sqlalchemy import select, delete, func
+from src.config import Config
+from src.database.db import AsyncSessionLocal, dialect_insert
+from src.database.models import FSMState
+from src.utils.cache import LRUCache
+from src.utils.ipc import EventBus, FSM_CHANGED
+
+
+class _Record:
+    """Состояние и данные FSM одного ключа в памяти процесса."""
+    
+    __slots__ = ('state', 'data', 'loaded_at')
+    
+    def __init__(self, state: str | None, data: dict, loaded_at: float):
+        self.state = state
+        self.data = data
+        self.loaded_at = loaded_at
+
+
+class DatabaseStorage(BaseStorage):
+    """
+    FSM-хранилище в таблице fsm_states с кэшем чтения и отложенной записью.
+    
+    Чтения обслуживаются из памяти: запись загружается из БД при первом
+    обращении и считается актуальной FSM_CACHE_TTL секунд, чтобы процессы,
+    обрабатывающие один диалог по очереди, видели изменения друг друга.
+    Изменения применяются в памяти сразу, а в БД записываются пакетом раз в
+    FSM_FLUSH_INTERVAL секунд и при остановке диспетчера. Пока пакет
+    записывается, его записи читаются из памяти, а не из еще не обновленной БД.
+    
+    С шиной событий хранилище общее для нескольких процессов бота: изменения
+    записываются в БД сразу, после коммита остальные процессы получают по
+    шине ключи измененных записей и удаляют их из кэша. Пока соединения с
+    шиной нет, кэш отключен и каждое чтение идет в БД.
+    """
+    
+    def __init__(
+        self,
+        flush_interval: float | None = None,
+        cache_ttl: float | None = None,
+        cache_size: int | None = None,
+        key_builder: KeyBuilder | None = None,
+        event_bus: EventBus | None = None
+    ):
+        self.flush_interval = flush_interval or Config.FSM_FLUSH_INTERVAL
+        self.cache_ttl = Config.FSM_CACHE_TTL if cache_ttl is None else cache_ttl
+        self.key_builder = key_builder or DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+        self._cache = LRUCache(cache_size or Config.FSM_CACHE_SIZE)
+        self._cache_size = self._cache.max_size
+        self.event_bus = event_bus
+        self._dirty: dict[str, _Record] = {}
+        self._flushing: dict[str, _Record] = {}
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        
+        if event_bus is not None:
+            self._on_connection(False)
+            event_bus.on_connection(self._on_connection)
+            event_bus.subscribe(FSM_CHANGED, self._invalidate)
+    
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        storage_key, record = await self._load(key)
+        record.state = state.state if isinstance(state, State) else state
+        await self._mark_dirty(storage_key, record)
+    
+    async def get_state(self, key: StorageKey) -> str | None:
+        _, record = await self._load(key)
+        return record.state
+    
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        storage_key, record = await self._load(key)
+        record.data = dict(data)
+        await self._mark_dirty(storage_key, record)
+    
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        _, record = await self._load(key)
+        return record.data.copy()
+    
+    async def close(self) -> None:
+        """Остановка фоновой записи и сброс несохраненных изменений."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        
+        await self.flush()
+    
+    async def flush(self) -> int:
+        """Запись измененных состояний одной транзакцией. Возвращает число записей."""
+        async with self._lock:
+            if not self._dirty:
+                return 0
+            
+            dirty, self._dirty = self._dirty, {}
+            self._flushing = dirty
+            rows = []
+            removed = []
+            for storage_key, record in dirty.items():
+                if record.state is None and not record.data:
+                    removed.append(storage_key)
+                else:
+                    rows.append({
+                        'key': storage_key,
+                        'state': record.state,
+                        'data': json.dumps(record.data, ensure_ascii=False)
+                    })
+            
+            try:
+                async with AsyncSessionLocal() as db:
+                    if rows:
+                        statement = dialect_insert(FSMState.__table__)
+                        statement = statement.on_conflict_do_update(
+                            index_elements=['key'],
+                            set_={
+                                'state': statement.excluded.state,
+                                'data': statement.excluded.data,
+                                'updated_at': func.now()
+                            }
+                        )
+                        await db.execute(statement, rows)
+                    if removed:
+                        await db.execute(delete(FSMState.__table__).where(FSMState.__table__.c.key.in_(removed)))
+                    await db.commit()
+            except Exception as e:
+                print(f"Ошибка при сохранении состояний FSM ({len(dirty)}): {e}")
+                for storage_key, record in dirty.items():
+                    self._dirty.setdefault(storage_key, record)
+                return 0
+            finally:
+                self._flushing = {}
+            
+            now = time.monotonic()
+            for record in dirty.values():
+                record.loaded_at = now
+            if self.event_bus is not None:
+                self.event_bus.publish(FSM_CHANGED, list(dirty))
+            return len(dirty)
+    
+    async def _load(self, key: StorageKey) -> tuple[str, _Record]:
+        """Запись ключа из памяти или, если ее нет или она устарела, из БД."""
+        storage_key = self.key_builder.build(key)
+        
+        record = self._dirty.get(storage_key) or self._flushing.get(storage_key)
+        if record is not None:
+            return storage_key, record
+        
+        record = self._cache.get(storage_key)
+        now = time.monotonic()
+        if record is not None and now - record.loaded_at < self.cache_ttl:
+            return storage_key, record
+        
+        async with AsyncSessionLocal() as db:
+            row = (await db.execute(
+                select(FSMState.state, FSMState.data).where(FSMState.key == storage_key)
+            )).first()
+        
+        # За время чтения запись могли изменить или сохранить в БД - она новее прочитанной строки
+        record = self._dirty.get(storage_key) or self._flushing.get(storage_key)
+        if record is None:
+            cached = self._cache.get(storage_key)
+            if cached is not None and cached.loaded_at >= now:
+                return storage_key, cached
+            record = _Record(row.state, json.loads(row.data), now) if row else _Record(None, {}, now)
+            self._cache.set(storage_key, record)
+        return storage_key, record
+    
+    async def _mark_dirty(self, storage_key: str, record: _Record):
+        """Постановка записи в очередь на сохранение (в общем хранилище - запись сразу)."""
+        self._dirty[storage_key] = record
+        self._cache.set(storage_key, record)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        if self.event_bus is not None:
+            await self.flush()
+    
+    def _invalidate(self, keys: list[str]):
+        """Удаление из кэша записей, измененных другим процессом."""
+        for storage_key in keys:
+            if storage_key not in self._dirty:
+                self._cache.pop(storage_key)
+    
+    def _on_connection(self, connected: bool):
+        """Без соединения с шиной изменения других процессов не видны - кэш отключается."""
+        self._cache.max_size = self._cache_size if connected else 0
+        self._cache.clear()
+    
+    async def _run(self):
+        """Периодическая запись измененных состояний."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
@@ -0,0 +1,146 @@
+"""Ограничение частоты запросов пользователей к обработчикам бота."""
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable
+from aiogram import BaseMiddleware, Router
+from aiogram.dispatcher.flags import get_flag
+from aiogram.types import TelegramObject, Message, CallbackQuery
+from src.config import Config
+
+
+@dataclass(frozen=True)
+class ThrottleLimit:
+    """Не более rate вызовов обработчика одним пользователем за period секунд."""
+    rate: int
+    period: float
+
+
+class SlidingWindow:
+    """
+    Скользящее окно из двух счетчиков: текущего и предыдущего интервалов.
+    
+    Число запросов за последние period секунд оценивается как доля
+    предыдущего интервала плюс текущий, поэтому окно занимает
+    постоянную память независимо от лимита.
+    """
+    
+    __slots__ = ('start', 'current', 'previous', 'expires_at', 'notified')
+    
+    def __init__(self, now: float):
+        self.start = now
+        self.current = 0
+        self.previous = 0
+        self.expires_at = now
+        self.notified = False
+    
+    def hit(self, limit: ThrottleLimit, now: float) -> float:
+        """Учет запроса. Возвращает 0, если запрос разрешен, иначе - секунды до следующего интервала."""
+        elapsed = now - self.start
+        if elapsed >= limit.period:
+            intervals = int(elapsed // limit.period)
+            self.previous = self.current if intervals == 1 else 0
+            self.current = 0
+            self.start += intervals * limit.period
+            self.notified = False
+            elapsed = now - self.start
+        
+        self.expires_at = self.start + 2 * limit.period
+        estimate = self.previous * (limit.period - elapsed) / limit.period + self.current
+        if estimate + 1 > limit.rate:
+            return limit.period - elapsed
+        
+        self.current += 1
+        return 0.0
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Ограничение частоты вызовов обработчиков для каждого пользователя.
+    
+    Лимит берется из флага обработчика throttling, иначе - из лимита
+    роутера, которому принадлежит обработчик. Повторные одинаковые нажатия
+    inline-кнопки, пришедшие во время обработки первого или в течение
+    coalesce_window секунд после нее, не выполняются повторно.
+    """
+    
+    def __init__(
+        self,
+        limits: dict[Router, ThrottleLimit],
+        coalesce_window: float | None = None,
+        max_keys: int | None = None
+    ):
+        self.limits = limits
+        self.coalesce_window = coalesce_window if coalesce_window is not None else Config.THROTTLE_COALESCE_WINDOW
+        self.max_keys = max_keys or Config.THROTTLE_MAX_KEYS
+        self._windows: OrderedDict[Hashable, SlidingWindow] = OrderedDict()
+        self._in_flight: set[Hashable] = set()
+        self._completed: OrderedDict[Hashable, float] = OrderedDict()
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any]
+    ) -> Any:
+        limit = get_flag(data, 'throttling', default=self.limits.get(data.get('event_router')))
+        user = data.get('event_from_user')
+        if limit is None or user is None:
+            return await handler(event, data)
+        
+        now = time.monotonic()
+        self._evict(now)
+        
+        callback_key = None
+        if isinstance(event, CallbackQuery):
+            callback_key = (user.id, event.message.message_id if event.message else None, event.data)
+            if callback_key in self._in_flight or callback_key in self._completed:
+                await event.answer()
+                return None
+        
+        window_key = (user.id, data['handler'].callback)
+        window = self._windows.get(window_key)
+        if window is None:
+            window = self._windows[window_key] = SlidingWindow(now)
+        self._windows.move_to_end(window_key)
+        
+        wait = window.hit(limit, now)
+        if wait:
+            await self._reject(event, window, wait)
+            return None
+        
+        if callback_key is None:
+            return await handler(event, data)
+        
+        self._in_flight.add(callback_key)
+        try:
+            return await handler(event, data)
+        finally:
+            self._in_flight.discard(callback_key)
+            if self.coalesce_window > 0:
+                self._completed.pop(callback_key, None)
+                self._completed[callback_key] = time.monotonic() + self.coalesce_window
+    
+    async def _reject(self, event: TelegramObject, window: SlidingWindow, wait: float):
+        """Ответ на запрос сверх лимита (на сообщения - один раз за интервал)."""
+        text = f"⏳ Слишком много запросов, повторите через {math.ceil(wait)} с"
+        if isinstance(event, CallbackQuery):
+            await event.answer(text)
+        elif isinstance(event, Message) and not window.notified:
+            window.notified = True
+            await event.answer(text)
+    
+    def _evict(self, now: float):
+        """Удаление окон бездействующих пользователей и истекших отметок о нажатиях."""
+        while self._windows:
+            key, window = next(iter(self._windows.items()))
+            if window.expires_at > now and len(self._windows) <= self.max_keys:
+                break
+            del self._windows[key]
+        
+        while self._completed:
+            key, expires_at = next(iter(self._completed.items()))
+            if expires_at > now:
+                break
+            del self._completed[key]
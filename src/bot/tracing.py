@@ -0,0 +1,56 @@
+"""Привязка SQL-запросов к обновлениям бота в режиме трассировки."""
+from typing import Any, Awaitable, Callable
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.types import TelegramObject, Update
+from src.utils.tracing import current_trace, start_update_trace, finish_update_trace, print_summary
+
+
+class UpdateTraceMiddleware(BaseMiddleware):
+    """Трассировка SQL-запросов на время обработки обновления."""
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: dict[str, Any]
+    ) -> Any:
+        trace = start_update_trace(event.update_id)
+        try:
+            return await handler(event, data)
+        finally:
+            finish_update_trace(trace)
+
+
+class HandlerTraceMiddleware(BaseMiddleware):
+    """Имя обработчика в трассе обновления."""
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any]
+    ) -> Any:
+        trace = current_trace.get()
+        if trace is not None:
+            trace.handler = data['handler'].callback.__name__
+        return await handler(event, data)
+
+
+async def report_sql_trace():
+    """Вывод сводки трассировки при остановке диспетчера."""
+    print_summary()
+
+
+def setup_sql_tracing(dp: Dispatcher):
+    """Подключение трассировки к диспетчеру; имя обработчика записывается после ограничения частоты."""
+    # Трасса начинается раньше встроенных middleware: FSM middleware читает состояние из БД
+    builtin = list(dp.update.outer_middleware)
+    for middleware in builtin:
+        dp.update.outer_middleware.unregister(middleware)
+    dp.update.outer_middleware(UpdateTraceMiddleware())
+    for middleware in builtin:
+        dp.update.outer_middleware(middleware)
+    handler_trace = HandlerTraceMiddleware()
+    dp.message.middleware(handler_trace)
+    dp.callback_query.middleware(handler_trace)
+    dp.shutdown.register(report_sql_trace)
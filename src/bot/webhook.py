@@ -0,0 +1,77 @@
+"""Прием обновлений бота через вебхук в нескольких процессах."""
+import asyncio
+import signal
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from src.bot.bot import create_bot
+from src.config import Config
+from src.database.db import close_db
+from src.utils.ipc import EventBus
+from src.utils.metrics import start_metrics_server
+
+
+def create_webhook_app(bot: Bot, dp: Dispatcher) -> web.Application:
+    """aiohttp-приложение, передающее обновления вебхука в диспетчер."""
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=Config.WEBHOOK_SECRET or None
+    ).register(app, path=Config.WEBHOOK_PATH)
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def set_webhook():
+    """Регистрация URL вебхука в Bot API (выполняется один раз перед запуском воркеров)."""
+    bot, _ = create_bot()
+    try:
+        await bot.set_webhook(
+            url=Config.WEBHOOK_URL.rstrip('/') + Config.WEBHOOK_PATH,
+            secret_token=Config.WEBHOOK_SECRET or None,
+            drop_pending_updates=True
+        )
+    finally:
+        await bot.session.close()
+
+
+async def serve_webhook(index: int = 0):
+    """
+    Работа одного воркера: все воркеры слушают общий порт через SO_REUSEPORT.
+    
+    Метрики у каждого воркера свои, на порту METRICS_PORT + 1 + index.
+    """
+    bot, dp = create_bot(EventBus())
+    metrics = await start_metrics_server(1 + index)
+    
+    runner = web.AppRunner(create_webhook_app(bot, dp), handle_signals=False)
+    await runner.setup()
+    site = web.TCPSite(
+        runner,
+        Config.WEBHOOK_HOST,
+        Config.WEBHOOK_PORT,
+        reuse_port=Config.WEBHOOK_WORKERS > 1
+    )
+    await site.start()
+    print(f"✅ Воркер вебхука {index} слушает {Config.WEBHOOK_HOST}:{Config.WEBHOOK_PORT}{Config.WEBHOOK_PATH}")
+    
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    
+    try:
+        await stop.wait()
+    finally:
+        await runner.cleanup()
+        await bot.session.close()
+        if metrics is not None:
+            await metrics.stop()
+        await close_db()
+        print(f"Воркер вебхука {index} остановлен")
+
+
+def webhook_worker(index: int):
+    """Точка входа процесса воркера вебхука."""
+    asyncio.run(serve_webhook(index))
@@ -1,4 +1,5 @@
 """Конфигурация приложения с загрузкой переменных окружения."""
+import json
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -7,6 +8,56 @@ env_path = Path(__file__).parent.parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
 
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+
+def to_async_url(url: str) -> str:
+    """Преобразование URL базы данных в URL с асинхронным драйвером."""
+    scheme, sep, rest = url.partition('://')
+    if '+' in scheme or scheme not in ASYNC_DRIVERS:
+        return url
+    return f"{ASYNC_DRIVERS[scheme]}{sep}{rest}"
+
+
+DEFAULT_EXTRACTION_RULES = [
+    {
+        'field': 'service_type',
+        'patterns': [r'(?:тип|услуга|проект|вид)[\s:]+([^\n]+)'],
+        'priority': 0,
+        'fallback': 'first_line',
+        'fallback_limit': 100,
+    },
+    {
+        'field': 'service_type',
+        'patterns': [r'(?:выполнен|сделан|реализован)[\s:]+([^\n]+)'],
+        'priority': 1,
+    },
+    {
+        'field': 'description',
+        'patterns': [],
+        'fallback': 'head',
+        'fallback_limit': 500,
+    },
+]
+
+
+def load_extraction_rules(path: str) -> list[dict]:
+    """Загрузка правил извлечения данных из JSON-файла или правил по умолчанию."""
+    if not path:
+        return DEFAULT_EXTRACTION_RULES
+    with open(path, encoding='utf-8') as rules_file:
+        return json.load(rules_file)
+
+
+def parse_rate_limit(value: str) -> tuple[int, float]:
+    """Разбор ограничения частоты вида "10/60" (не более 10 запросов за 60 секунд)."""
+    rate, _, period = value.partition('/')
+    return int(rate), float(period or '1')
+
+
 class Config:
     """Класс для хранения конфигурации приложения."""
     
@@ -16,13 +67,97 @@ class Config:
     BOT_TOKEN: str = os.getenv('BOT_TOKEN', '')
     
     CHANNEL_ID: str = os.getenv('CHANNEL_ID', '')
+    CHANNEL_IDS: list[str] = [channel.strip() for channel in CHANNEL_ID.split(',') if channel.strip()]
     
     MANAGER_ID: int = int(os.getenv('MANAGER_ID', '0'))
     LEADER_ID: int = int(os.getenv('LEADER_ID', '0'))
     
     SESSION_NAME: str = os.getenv('SESSION_NAME', 'telegram_session')
     
+    BOT_MODE: str = os.getenv('BOT_MODE', 'polling')
+    BOT_API_URL: str = os.getenv('BOT_API_URL', '')
+    WEBHOOK_URL: str = os.getenv('WEBHOOK_URL', '')
+    WEBHOOK_PATH: str = os.getenv('WEBHOOK_PATH', '/webhook')
+    WEBHOOK_SECRET: str = os.getenv('WEBHOOK_SECRET', '')
+    WEBHOOK_HOST: str = os.getenv('WEBHOOK_HOST', '0.0.0.0')
+    WEBHOOK_PORT: int = int(os.getenv('WEBHOOK_PORT', '8080'))
+    WEBHOOK_WORKERS: int = int(os.getenv('WEBHOOK_WORKERS', '1'))
+    
+    IPC_SOCKET: str = os.getenv('IPC_SOCKET', './app_events.sock')
+    IPC_RECONNECT_DELAY: float = float(os.getenv('IPC_RECONNECT_DELAY', '1.0'))
+    PARSER_RESTART: str = os.getenv('PARSER_RESTART', 'always')
+    BOT_RESTART: str = os.getenv('BOT_RESTART', 'always')
+    RESTART_DELAY: float = float(os.getenv('RESTART_DELAY', '1'))
+    RESTART_MAX_DELAY: float = float(os.getenv('RESTART_MAX_DELAY', '60'))
+    RESTART_RESET_AFTER: float = float(os.getenv('RESTART_RESET_AFTER', '60'))
+    STOP_TIMEOUT: float = float(os.getenv('STOP_TIMEOUT', '10'))
+    
     DATABASE_URL: str = os.getenv('DATABASE_URL', 'sqlite:///./telegram_bot.db')
+    ASYNC_DATABASE_URL: str = os.getenv('ASYNC_DATABASE_URL', to_async_url(DATABASE_URL))
+    
+    DB_POOL_SIZE: int = int(os.getenv('DB_POOL_SIZE', '10'))
+    DB_MAX_OVERFLOW: int = int(os.getenv('DB_MAX_OVERFLOW', '20'))
+    DB_POOL_RECYCLE: int = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+    SQLITE_POOL_SIZE: int = int(os.getenv('SQLITE_POOL_SIZE', '5'))
+    SQLITE_JOURNAL_MODE: str = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS: str = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_MMAP_SIZE: int = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+    SQLITE_CACHE_SIZE: int = int(os.getenv('SQLITE_CACHE_SIZE', '-65536'))
+    SQLITE_BUSY_TIMEOUT: int = int(os.getenv('SQLITE_BUSY_TIMEOUT', '5000'))
+    
+    INGEST_BATCH_SIZE: int = int(os.getenv('INGEST_BATCH_SIZE', '100'))
+    INGEST_FLUSH_INTERVAL: float = float(os.getenv('INGEST_FLUSH_INTERVAL', '1.0'))
+    INGEST_MAX_PENDING: int = int(os.getenv('INGEST_MAX_PENDING', '10000'))
+    
+    BACKFILL_PAGE_SIZE: int = int(os.getenv('BACKFILL_PAGE_SIZE', '1000'))
+    BACKFILL_WAIT_TIME: float = float(os.getenv('BACKFILL_WAIT_TIME', '0.5'))
+    RECONNECT_DELAY: float = float(os.getenv('RECONNECT_DELAY', '5'))
+    CATCH_UP_CONCURRENCY: int = int(os.getenv('CATCH_UP_CONCURRENCY', '5'))
+    
+    EXTRACTION_RULES_FILE: str = os.getenv('EXTRACTION_RULES_FILE', '')
+    EXTRACTION_RULES: list[dict] = load_extraction_rules(EXTRACTION_RULES_FILE)
+    
+    PARSER_WORKERS: int = int(os.getenv('PARSER_WORKERS', '0'))
+    PARSER_POOL_MIN_BATCH: int = int(os.getenv('PARSER_POOL_MIN_BATCH', '200'))
+    PARSER_POOL_CHUNK_SIZE: int = int(os.getenv('PARSER_POOL_CHUNK_SIZE', '250'))
+    
+    SEARCH_CANDIDATES: int = int(os.getenv('SEARCH_CANDIDATES', '200'))
+    POSTS_COUNT_TTL: float = float(os.getenv('POSTS_COUNT_TTL', '60'))
+    FEED_CACHE_SIZE: int = int(os.getenv('FEED_CACHE_SIZE', '256'))
+    
+    SENDER_WORKERS: int = int(os.getenv('SENDER_WORKERS', '4'))
+    SENDER_GLOBAL_RATE: float = float(os.getenv('SENDER_GLOBAL_RATE', '30'))
+    SENDER_CHAT_RATE: float = float(os.getenv('SENDER_CHAT_RATE', '1'))
+    SENDER_GROUP_RATE: float = float(os.getenv('SENDER_GROUP_PER_MINUTE', '20')) / 60
+    SENDER_MAX_RETRIES: int = int(os.getenv('SENDER_MAX_RETRIES', '5'))
+    SENDER_RETRY_DELAY: float = float(os.getenv('SENDER_RETRY_DELAY', '1'))
+    SENDER_MAX_RETRY_DELAY: float = float(os.getenv('SENDER_MAX_RETRY_DELAY', '60'))
+    SENDER_QUEUE_SIZE: int = int(os.getenv('SENDER_QUEUE_SIZE', '10000'))
+    
+    OUTBOX_BATCH_SIZE: int = int(os.getenv('OUTBOX_BATCH_SIZE', '50'))
+    OUTBOX_POLL_INTERVAL: float = float(os.getenv('OUTBOX_POLL_INTERVAL', '1.0'))
+    OUTBOX_LEASE: float = float(os.getenv('OUTBOX_LEASE', '60'))
+    OUTBOX_MAX_ATTEMPTS: int = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '10'))
+    OUTBOX_RETENTION_DAYS: int = int(os.getenv('OUTBOX_RETENTION_DAYS', '7'))
+    
+    BULK_STATUS_LIMIT: int = int(os.getenv('BULK_STATUS_LIMIT', '1000'))
+    
+    FSM_FLUSH_INTERVAL: float = float(os.getenv('FSM_FLUSH_INTERVAL', '0.2'))
+    FSM_CACHE_TTL: float = float(os.getenv('FSM_CACHE_TTL', '1.0'))
+    FSM_CACHE_SIZE: int = int(os.getenv('FSM_CACHE_SIZE', '10000'))
+    
+    THROTTLE_COMMANDS: tuple[int, float] = parse_rate_limit(os.getenv('THROTTLE_COMMANDS', '10/10'))
+    THROTTLE_APPLICATIONS: tuple[int, float] = parse_rate_limit(os.getenv('THROTTLE_APPLICATIONS', '10/10'))
+    THROTTLE_POSTS: tuple[int, float] = parse_rate_limit(os.getenv('THROTTLE_POSTS', '20/10'))
+    THROTTLE_STATISTICS: tuple[int, float] = parse_rate_limit(os.getenv('THROTTLE_STATISTICS', '3/30'))
+    THROTTLE_COALESCE_WINDOW: float = float(os.getenv('THROTTLE_COALESCE_WINDOW', '1.0'))
+    THROTTLE_MAX_KEYS: int = int(os.getenv('THROTTLE_MAX_KEYS', '100000'))
+    
+    METRICS_PORT: int = int(os.getenv('METRICS_PORT', '0'))
+    METRICS_HOST: str = os.getenv('METRICS_HOST', '127.0.0.1')
+    
+    SQL_TRACE: bool = os.getenv('SQL_TRACE', '').lower() in ('1', 'true', 'yes')
+    SQL_SLOW_QUERY_MS: float = float(os.getenv('SQL_SLOW_QUERY_MS', '100'))
     
     @classmethod
     def validate(cls) -> bool:
@@ -43,5 +178,15 @@ class Config:
                 f"Отсутствуют обязательные переменные окружения: {', '.join(missing)}"
             )
         
+        if cls.BOT_MODE not in ('polling', 'webhook'):
+            raise ValueError(f"Неизвестный режим работы бота BOT_MODE: {cls.BOT_MODE}")
+        
+        if cls.BOT_MODE == 'webhook' and not cls.WEBHOOK_URL:
+            raise ValueError("Для режима webhook необходимо задать WEBHOOK_URL")
+        
+        for name in ('PARSER_RESTART', 'BOT_RESTART'):
+            if getattr(cls, name) not in ('always', 'on-failure', 'never'):
+                raise ValueError(f"Неизвестная политика перезапуска {name}: {getattr(cls, name)}")
+        
         return True
 
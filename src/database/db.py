@@ -1,31 +1,87 @@
 """Инициализация базы данных."""
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import event, Table
+from sqlalchemy.engine import Engine
+from sqlalchemy.dialects import sqlite, postgresql
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import declarative_base
 from src.config import Config
+from src.utils.metrics import instrument_engine
+from src.utils.tracing import trace_engine
 
 
 Base = declarative_base()
 
 
-engine = create_engine(
-    Config.DATABASE_URL,
-    connect_args={'check_same_thread': False} if 'sqlite' in Config.DATABASE_URL else {}
-)
+def engine_options(url: str) -> dict:
+    """Параметры пула соединений для движка базы данных."""
+    if url.startswith('sqlite'):
+        if ':memory:' in url or url.rstrip('/').endswith(':'):
+            return {}
+        # Запись в SQLite все равно последовательна: небольшой пул без переполнения
+        return {
+            'pool_size': Config.SQLITE_POOL_SIZE,
+            'max_overflow': 0,
+        }
+    return {
+        'pool_size': Config.DB_POOL_SIZE,
+        'max_overflow': Config.DB_MAX_OVERFLOW,
+        'pool_recycle': Config.DB_POOL_RECYCLE,
+        'pool_pre_ping': True,
+    }
 
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Настройка каждого нового соединения SQLite: WAL, синхронизация, mmap, кэш и ожидание блокировки."""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={Config.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={Config.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size={Config.SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size={Config.SQLITE_CACHE_SIZE}")
+        cursor.execute(f"PRAGMA busy_timeout={Config.SQLITE_BUSY_TIMEOUT}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
 
 
-def init_db():
-    """Инициализация базы данных - создание всех таблиц."""
-    Base.metadata.create_all(bind=engine)
+def tune_engine(engine: Engine) -> Engine:
+    """Подключение настроек соединений SQLite к движку (для других СУБД ничего не меняет)."""
+    if engine.dialect.name == 'sqlite':
+        event.listen(engine, 'connect', apply_sqlite_pragmas)
+    return engine
 
 
-def get_db():
-    """Получение сессии базы данных."""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+async_engine = create_async_engine(Config.ASYNC_DATABASE_URL, **engine_options(Config.ASYNC_DATABASE_URL))
+tune_engine(async_engine.sync_engine)
+if Config.METRICS_PORT:
+    instrument_engine(async_engine.sync_engine)
+if Config.SQL_TRACE:
+    trace_engine(async_engine.sync_engine)
+
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+
+async def init_db():
+    """Инициализация базы данных - создание таблиц и применение миграций."""
+    from src.database.migrations import run_migrations
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(run_migrations)
+
+
+async def close_db():
+    """Закрытие пула соединений асинхронного движка."""
+    await async_engine.dispose()
+
 
+def dialect_insert(table: Table):
+    """INSERT с поддержкой ON CONFLICT для диалекта асинхронного движка."""
+    if async_engine.dialect.name == 'postgresql':
+        return postgresql.insert(table)
+    return sqlite.insert(table)
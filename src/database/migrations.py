@@ -0,0 +1,116 @@
+"""Версионные миграции схемы базы данных."""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+from sqlalchemy import inspect, insert, select, text
+from sqlalchemy.engine import Connection
+from src.database.db import Base
+from src.database.models import SchemaMigration
+
+
+@dataclass(frozen=True)
+class Migration:
+    """Миграция схемы: номер версии, название и функция применения."""
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+
+MIGRATIONS: list[Migration] = []
+
+
+def migration(version: int, name: str):
+    """
+    Регистрация функции миграции под номером версии.
+    
+    Таблицы из моделей создает create_all до запуска миграций, а базы,
+    созданные до появления миграций, могут содержать часть изменений,
+    поэтому миграции должны быть идемпотентными (IF NOT EXISTS и т.п.).
+    """
+    def register(upgrade: Callable[[Connection], None]):
+        if any(existing.version == version for existing in MIGRATIONS):
+            raise ValueError(f"Миграция с версией {version} уже зарегистрирована")
+        MIGRATIONS.append(Migration(version, name, upgrade))
+        return upgrade
+    return register
+
+
+def add_missing_columns(connection: Connection, table_name: str, columns: list[str]):
+    """Добавление в существующую таблицу колонок модели, которых в ней еще нет."""
+    existing = {column['name'] for column in inspect(connection).get_columns(table_name)}
+    table = Base.metadata.tables[table_name]
+    for column_name in columns:
+        if column_name in existing:
+            continue
+        column_type = table.c[column_name].type.compile(dialect=connection.dialect)
+        connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}"))
+
+
+def execute_all(connection: Connection, statements: list[str]):
+    """Выполнение списка SQL-выражений."""
+    for statement in statements:
+        connection.execute(text(statement))
+
+
+@migration(1, 'posts_edit_and_delete_columns')
+def posts_edit_and_delete_columns(connection: Connection):
+    """Колонки времени редактирования и мягкого удаления постов."""
+    add_missing_columns(connection, 'posts', ['updated_at', 'deleted_at'])
+
+
+@migration(2, 'posts_composite_indexes')
+def posts_composite_indexes(connection: Connection):
+    """Уникальность поста в канале и индексы ленты по (created_at, id)."""
+    execute_all(connection, [
+        "DROP INDEX IF EXISTS ix_posts_message_id",
+        "DROP INDEX IF EXISTS ix_posts_channel_id",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_posts_channel_message ON posts (channel_id, message_id)",
+        "CREATE INDEX IF NOT EXISTS ix_posts_created_id ON posts (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_posts_channel_created_id ON posts (channel_id, created_at, id)",
+    ])
+
+
+@migration(3, 'posts_search_index')
+def posts_search_index(connection: Connection):
+    """FTS-индекс постов с триггерами синхронизации."""
+    from src.database.search import setup_search_index
+    setup_search_index(connection)
+
+
+@migration(4, 'application_stats_backfill')
+def application_stats_backfill(connection: Connection):
+    """Заполнение счетчиков статистики по уже существующим заявкам."""
+    from src.database.stats import setup_application_stats
+    setup_application_stats(connection)
+
+
+@migration(5, 'applications_composite_indexes')
+def applications_composite_indexes(connection: Connection):
+    """Индексы списка заявок для постраничного просмотра с фильтрами."""
+    execute_all(connection, [
+        "DROP INDEX IF EXISTS ix_applications_user_id",
+        "CREATE INDEX IF NOT EXISTS ix_applications_created_id ON applications (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_applications_status_created_id ON applications (status, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_applications_user_created_id ON applications (user_id, created_at, id)",
+    ])
+
+
+def pending_migrations(connection: Connection) -> list[Migration]:
+    """Миграции, еще не примененные к базе, в порядке версий."""
+    applied = set(connection.scalars(select(SchemaMigration.version)))
+    return [
+        item for item in sorted(MIGRATIONS, key=lambda item: item.version)
+        if item.version not in applied
+    ]
+
+
+def run_migrations(connection: Connection) -> list[Migration]:
+    """Применение недостающих миграций в текущей транзакции. Возвращает примененные миграции."""
+    pending = pending_migrations(connection)
+    for item in pending:
+        item.upgrade(connection)
+        connection.execute(
+            insert(SchemaMigration).values(version=item.version, name=item.name, applied_at=datetime.now())
+        )
+        print(f"Применена миграция {item.version}: {item.name}")
+    return pending
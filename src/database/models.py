@@ -1,5 +1,5 @@
 """Модели базы данных."""
-from sqlalchemy import Column, Integer, String, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Index, Enum as SQLEnum
 from sqlalchemy.sql import func
 from datetime import datetime
 import enum
@@ -16,25 +16,49 @@ class ApplicationStatus(enum.Enum):
 class Post(Base):
     """Модель для спарсенных постов из Telegram-канала."""
     __tablename__ = "posts"
+    __table_args__ = (
+        Index('ix_posts_channel_message', 'channel_id', 'message_id', unique=True),
+        Index('ix_posts_created_id', 'created_at', 'id'),
+        Index('ix_posts_channel_created_id', 'channel_id', 'created_at', 'id'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    channel_id = Column(String, nullable=False, index=True)
-    message_id = Column(Integer, nullable=False, unique=True, index=True)
+    channel_id = Column(String, nullable=False)
+    message_id = Column(Integer, nullable=False)
     service_type = Column(String, nullable=True)  
     description = Column(String, nullable=True)  
     published_date = Column(DateTime, nullable=True)  
     created_at = Column(DateTime, default=func.now(), nullable=False)
+    updated_at = Column(DateTime, nullable=True)
+    deleted_at = Column(DateTime, nullable=True)
     
     def __repr__(self):
-        return f"<Post(id={self.id}, message_id={self.message_id}, service_type={self.service_type})>"
+        return f"<Post(id={self.id}, channel_id={self.channel_id}, message_id={self.message_id}, service_type={self.service_type})>"
+
+
+class ParserCheckpoint(Base):
+    """Модель для контрольной точки импорта истории канала."""
+    __tablename__ = "parser_checkpoints"
+    
+    channel_id = Column(String, primary_key=True)
+    last_message_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<ParserCheckpoint(channel_id={self.channel_id}, last_message_id={self.last_message_id})>"
 
 
 class Application(Base):
     """Модель для заявок от пользователей."""
     __tablename__ = "applications"
+    __table_args__ = (
+        Index('ix_applications_created_id', 'created_at', 'id'),
+        Index('ix_applications_status_created_id', 'status', 'created_at', 'id'),
+        Index('ix_applications_user_created_id', 'user_id', 'created_at', 'id'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, nullable=False, index=True)
+    user_id = Column(Integer, nullable=False)
     user_name = Column(String, nullable=False)
     contact = Column(String, nullable=False)  
     task_description = Column(String, nullable=False)
@@ -45,3 +69,60 @@ class Application(Base):
     def __repr__(self):
         return f"<Application(id={self.id}, user_id={self.user_id}, status={self.status.value})>"
 
+
+class ApplicationStats(Base):
+    """Счетчики заявок по пользователю, дню создания и статусу (user_id = 0 - все пользователи)."""
+    __tablename__ = "application_stats"
+    
+    user_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    status = Column(SQLEnum(ApplicationStatus), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<ApplicationStats(user_id={self.user_id}, day={self.day}, status={self.status}, total={self.total})>"
+
+
+class OutboxMessage(Base):
+    """Модель для исходящего уведомления, записанного в одной транзакции с изменением данных."""
+    __tablename__ = "outbox"
+    __table_args__ = (
+        Index('ix_outbox_pending', 'sent_at', 'available_at'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    idempotency_key = Column(String, nullable=False, unique=True)
+    chat_id = Column(Integer, nullable=False)
+    text = Column(String, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, nullable=False, default=datetime.now)
+    sent_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<OutboxMessage(id={self.id}, chat_id={self.chat_id}, key={self.idempotency_key}, sent_at={self.sent_at})>"
+
+
+class FSMState(Base):
+    """Модель для состояния и данных FSM диалога бота."""
+    __tablename__ = "fsm_states"
+    
+    key = Column(String, primary_key=True)
+    state = Column(String, nullable=True)
+    data = Column(Text, nullable=False, default='{}')
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<FSMState(key={self.key}, state={self.state})>"
+
+
+class SchemaMigration(Base):
+    """Модель для примененной миграции схемы базы данных."""
+    __tablename__ = "schema_migrations"
+    
+    version = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    applied_at = Column(DateTime, default=datetime.now, nullable=False)
+    
+    def __repr__(self):
+        return f"<SchemaMigration(version={self.version}, name={self.name})>"
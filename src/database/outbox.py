@@ -0,0 +1,104 @@
+"""Транзакционный outbox исходящих уведомлений."""
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.db import dialect_insert
+from src.database.models import OutboxMessage
+
+
+async def enqueue_notification(db: AsyncSession, idempotency_key: str, chat_id: int, text: str):
+    """Запись уведомления в outbox текущей транзакции; повтор с тем же ключом игнорируется."""
+    await enqueue_notifications(db, [(idempotency_key, chat_id, text)])
+
+
+async def enqueue_notifications(db: AsyncSession, notifications: list[tuple[str, int, str]]):
+    """Запись пакета уведомлений (ключ, чат, текст) в outbox одним запросом."""
+    if not notifications:
+        return
+    now = datetime.now()
+    await db.execute(
+        dialect_insert(OutboxMessage.__table__)
+        .on_conflict_do_nothing(index_elements=['idempotency_key']),
+        [
+            {
+                'idempotency_key': idempotency_key,
+                'chat_id': chat_id,
+                'text': text,
+                'attempts': 0,
+                'available_at': now,
+            }
+            for idempotency_key, chat_id, text in notifications
+        ]
+    )
+
+
+async def claim_outbox_batch(
+    db: AsyncSession,
+    limit: int,
+    lease: float,
+    max_attempts: int
+) -> list[tuple[int, int, str, int]]:
+    """
+    Захват пакета неотправленных уведомлений (id, чат, текст, номер попытки) на lease секунд.
+    
+    Захваченные записи становятся недоступны другим воркерам до истечения
+    аренды; если отправка не будет подтверждена, запись вернется в очередь.
+    """
+    now = datetime.now()
+    table = OutboxMessage.__table__
+    candidates = (
+        select(table.c.id)
+        .where(
+            table.c.sent_at.is_(None),
+            table.c.available_at <= now,
+            table.c.attempts < max_attempts
+        )
+        .order_by(table.c.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        update(table)
+        .where(table.c.id.in_(candidates.scalar_subquery()))
+        .values(available_at=now + timedelta(seconds=lease), attempts=table.c.attempts + 1)
+        .returning(table.c.id, table.c.chat_id, table.c.text, table.c.attempts)
+    )
+    return sorted(result.tuples().all())
+
+
+async def mark_outbox_sent(db: AsyncSession, ids: list[int]):
+    """Отметка уведомлений как отправленных."""
+    if ids:
+        await db.execute(
+            update(OutboxMessage.__table__)
+            .where(OutboxMessage.__table__.c.id.in_(ids))
+            .values(sent_at=datetime.now())
+        )
+
+
+async def purge_outbox(db: AsyncSession, older_than: timedelta) -> int:
+    """Удаление давно отправленных уведомлений."""
+    result = await db.execute(
+        delete(OutboxMessage.__table__)
+        .where(OutboxMessage.__table__.c.sent_at < datetime.now() - older_than)
+    )
+    return max(result.rowcount, 0)
+
+
+async def discard_exhausted_outbox(db: AsyncSession, max_attempts: int, ids: list[int] | None = None) -> list[str]:
+    """
+    Удаление неотправленных уведомлений, исчерпавших max_attempts попыток доставки.
+    
+    Без ids удаляются только записи с истекшей арендой последней попытки
+    (например, оставшиеся после падения процесса). Возвращает ключи удаленных уведомлений.
+    """
+    if ids is not None and not ids:
+        return []
+    table = OutboxMessage.__table__
+    statement = delete(table).where(table.c.sent_at.is_(None), table.c.attempts >= max_attempts)
+    if ids is None:
+        statement = statement.where(table.c.available_at <= datetime.now())
+    else:
+        statement = statement.where(table.c.id.in_(ids))
+    result = await db.execute(statement.returning(table.c.idempotency_key))
+    return list(result.scalars())
@@ -0,0 +1,122 @@
+"""Полнотекстовый поиск по постам на основе SQLite FTS5."""
+import re
+from sqlalchemy import select, or_, literal_column, table, column, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.config import Config
+from src.database.models import Post
+
+
+MAX_QUERY_TERMS = 10
+
+
+SEARCH_INDEX_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+        service_type,
+        description,
+        content='posts',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_insert AFTER INSERT ON posts
+    WHEN new.deleted_at IS NULL
+    BEGIN
+        INSERT INTO posts_fts(rowid, service_type, description)
+        VALUES (new.id, new.service_type, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_delete AFTER DELETE ON posts
+    WHEN old.deleted_at IS NULL
+    BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, service_type, description)
+        VALUES ('delete', old.id, old.service_type, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_update
+    AFTER UPDATE OF service_type, description, deleted_at ON posts
+    BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, service_type, description)
+        SELECT 'delete', old.id, old.service_type, old.description
+        WHERE old.deleted_at IS NULL;
+        INSERT INTO posts_fts(rowid, service_type, description)
+        SELECT new.id, new.service_type, new.description
+        WHERE new.deleted_at IS NULL;
+    END
+    """,
+]
+
+
+posts_fts = table('posts_fts', column('rowid'), column('rank'))
+
+
+def setup_search_index(connection: Connection):
+    """Создание FTS-индекса постов и триггеров синхронизации (только SQLite)."""
+    if connection.dialect.name != 'sqlite':
+        return
+    
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'posts_fts'")
+    ).first()
+    
+    for statement in SEARCH_INDEX_DDL:
+        connection.execute(text(statement))
+    
+    if not exists:
+        connection.execute(text(
+            "INSERT INTO posts_fts(rowid, service_type, description) "
+            "SELECT id, service_type, description FROM posts WHERE deleted_at IS NULL"
+        ))
+
+
+def build_match_query(query: str) -> str:
+    """Преобразование пользовательского запроса в выражение FTS5 MATCH (префиксный поиск по словам)."""
+    terms = re.findall(r'\w+', query.lower())[:MAX_QUERY_TERMS]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+async def search_posts(db: AsyncSession, query: str, limit: int, offset: int = 0) -> list[Post]:
+    """
+    Поиск постов по типу услуги и описанию.
+    
+    В SQLite релевантность (bm25) считается только для SEARCH_CANDIDATES самых
+    новых совпадений: полная сортировка по рангу читает все найденные документы
+    и на миллионе постов занимает сотни миллисекунд для частых слов. Страницы
+    листаются внутри этого окна: оно одно и то же для всех страниц, поэтому
+    результаты не повторяются и не пропускаются, а всего находится не больше
+    SEARCH_CANDIDATES постов.
+    """
+    match = build_match_query(query)
+    if not match:
+        return []
+    
+    if db.bind.dialect.name == 'sqlite':
+        candidates = (
+            select(posts_fts.c.rowid, posts_fts.c.rank)
+            .where(literal_column('posts_fts').op('MATCH')(match))
+            .order_by(posts_fts.c.rowid.desc())
+            .limit(Config.SEARCH_CANDIDATES)
+            .subquery()
+        )
+        statement = (
+            select(Post)
+            .join(candidates, candidates.c.rowid == Post.id)
+            .order_by(candidates.c.rank, Post.id.desc())
+        )
+    else:
+        conditions = [
+            or_(Post.service_type.ilike(f"%{term}%"), Post.description.ilike(f"%{term}%"))
+            for term in re.findall(r'\w+', query.lower())[:MAX_QUERY_TERMS]
+        ]
+        statement = (
+            select(Post)
+            .where(Post.deleted_at.is_(None), *conditions)
+            .order_by(Post.created_at.desc(), Post.id.desc())
+        )
+    
+    result = await db.scalars(statement.limit(limit).offset(offset))
+    return list(result.all())
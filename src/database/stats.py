@@ -0,0 +1,106 @@
+"""Инкрементальные счетчики статистики заявок."""
+from datetime import date, datetime, timedelta
+from sqlalchemy import select, delete, func, case, literal
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.db import dialect_insert
+from src.database.models import Application, ApplicationStats, ApplicationStatus
+
+
+ALL_USERS = 0
+
+
+StatsDeltas = dict[tuple[int, date, ApplicationStatus], int]
+
+
+def add_stats_delta(
+    deltas: StatsDeltas,
+    user_id: int,
+    created_at: datetime,
+    status: ApplicationStatus,
+    amount: int
+):
+    """Учет изменения счетчика заявки пользователя и общего счетчика."""
+    day = created_at.date()
+    for key in ((user_id, day, status), (ALL_USERS, day, status)):
+        deltas[key] = deltas.get(key, 0) + amount
+
+
+async def apply_stats_deltas(db: AsyncSession, deltas: StatsDeltas):
+    """Применение накопленных изменений счетчиков в текущей транзакции."""
+    rows = [
+        {'user_id': user_id, 'day': day, 'status': status, 'total': amount}
+        for (user_id, day, status), amount in deltas.items()
+        if amount
+    ]
+    if not rows:
+        return
+    
+    statement = dialect_insert(ApplicationStats.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=['user_id', 'day', 'status'],
+        set_={'total': ApplicationStats.__table__.c.total + statement.excluded.total}
+    )
+    await db.execute(statement, rows)
+
+
+async def record_new_application(db: AsyncSession, application: Application):
+    """Учет новой заявки в счетчиках (до коммита транзакции с заявкой)."""
+    deltas: StatsDeltas = {}
+    add_stats_delta(deltas, application.user_id, application.created_at, application.status, 1)
+    await apply_stats_deltas(db, deltas)
+
+
+async def get_statistics(db: AsyncSession, user_id: int = ALL_USERS, now: datetime | None = None) -> dict:
+    """Статистика за все время, сегодня, неделю, месяц и по статусам одним запросом."""
+    today = (now or datetime.now()).date()
+    week_start = today - timedelta(days=today.weekday())
+    month_start = today.replace(day=1)
+    
+    def total_where(condition):
+        return func.coalesce(func.sum(case((condition, ApplicationStats.total), else_=0)), 0)
+    
+    columns = {
+        'total': func.coalesce(func.sum(ApplicationStats.total), 0),
+        'today': total_where(ApplicationStats.day >= today),
+        'week': total_where(ApplicationStats.day >= week_start),
+        'month': total_where(ApplicationStats.day >= month_start),
+    }
+    for status in ApplicationStatus:
+        columns[status.value] = total_where(ApplicationStats.status == status)
+    
+    row = (await db.execute(
+        select(*(column.label(name) for name, column in columns.items()))
+        .where(ApplicationStats.user_id == user_id)
+    )).one()
+    return dict(row._mapping)
+
+
+def rebuild_application_stats(connection: Connection) -> int:
+    """Пересчет всех счетчиков по таблице заявок. Возвращает число строк счетчиков."""
+    stats = ApplicationStats.__table__
+    day = func.date(Application.created_at)
+    
+    connection.execute(delete(stats))
+    
+    per_user = (
+        select(Application.user_id, day, Application.status, func.count(Application.id))
+        .group_by(Application.user_id, day, Application.status)
+    )
+    overall = (
+        select(literal(ALL_USERS), day, Application.status, func.count(Application.id))
+        .group_by(day, Application.status)
+    )
+    columns = ['user_id', 'day', 'status', 'total']
+    connection.execute(stats.insert().from_select(columns, per_user))
+    connection.execute(stats.insert().from_select(columns, overall))
+    
+    return connection.scalar(select(func.count()).select_from(stats))
+
+
+def setup_application_stats(connection: Connection):
+    """Заполнение счетчиков для базы, в которой заявки появились до их введения."""
+    has_stats = connection.execute(select(ApplicationStats.user_id).limit(1)).first()
+    has_applications = connection.execute(select(Application.id).limit(1)).first()
+    if has_applications and not has_stats:
+        rebuild_application_stats(connection)
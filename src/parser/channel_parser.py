@@ -1,110 +1,322 @@
 """Парсер Telegram-канала для извлечения информации из постов."""
 import asyncio
-import re
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from telethon import TelegramClient, events
-from telethon.tl.types import Message
-from sqlalchemy.orm import Session
+from telethon.errors import FloodWaitError
+from telethon.tl.types import Message, MessageService
+from sqlalchemy import select, func
 from src.config import Config
-from src.database.models import Post
-from src.database.db import SessionLocal
+from src.database.db import AsyncSessionLocal, dialect_insert
+from src.database.models import Post, ParserCheckpoint
+from src.parser.extraction import ExtractionEngine, init_worker, parse_chunk
+from src.parser.ingest import PostIngestQueue
+from src.utils.cache import invalidate_feed
+from src.utils.ipc import EventBus, POSTS_CHANGED
 
 
 class ChannelParser:
-    """Класс для парсинга Telegram-канала."""
+    """Класс для парсинга Telegram-каналов."""
     
-    def __init__(self):
+    def __init__(self, event_bus: EventBus | None = None):
         self.client = TelegramClient(
             Config.SESSION_NAME,
             Config.API_ID,
             Config.API_HASH
         )
         
-        try:
-            self.channel_id = int(Config.CHANNEL_ID)
-        except (ValueError, TypeError):
-            self.channel_id = Config.CHANNEL_ID
+        self.channels: dict[str, int | str] = {}
+        for channel in Config.CHANNEL_IDS:
+            try:
+                self.channels[channel] = int(channel)
+            except (ValueError, TypeError):
+                self.channels[channel] = channel
+        self._peer_channels: dict[int, str] = {}
+        self.extractor = ExtractionEngine.from_config()
+        self.executor = None
+        if Config.PARSER_WORKERS > 0:
+            self.executor = ProcessPoolExecutor(
+                max_workers=Config.PARSER_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_worker,
+                initargs=(Config.EXTRACTION_RULES,)
+            )
+        self.event_bus = event_bus
+        self.ingest = PostIngestQueue(on_commit=self._posts_changed, on_recovered=self._schedule_catch_up)
         self.running = False
+        self._catching_up = False
+        self._catch_up_task: asyncio.Task | None = None
+        self._pending_live: list[tuple[str, Message]] = []
+    
+    def _posts_changed(self):
+        """Сброс кэша ленты в этом процессе и оповещение процессов бота."""
+        invalidate_feed()
+        if self.event_bus is not None:
+            self.event_bus.publish(POSTS_CHANGED)
+    
+    def _schedule_catch_up(self):
+        """Догрузка постов, отброшенных при переполнении очереди записи, после восстановления БД."""
+        if self.running and (self._catch_up_task is None or self._catch_up_task.done()):
+            self._catch_up_task = asyncio.create_task(self.catch_up())
     
     async def start(self):
         """Запуск парсера."""
         await self.client.start()
+        self.ingest.start()
         self.running = True
         
-        @self.client.on(events.NewMessage(chats=self.channel_id))
+        for channel, entity in self.channels.items():
+            self._peer_channels[await self.client.get_peer_id(entity)] = channel
+        
+        @self.client.on(events.NewMessage(chats=list(self.channels.values())))
         async def handler(event: events.NewMessage.Event):
-            await self._process_message(event.message)
+            channel = self._peer_channels.get(event.chat_id)
+            if channel is None:
+                return
+            if self._catching_up:
+                self._pending_live.append((channel, event.message))
+                return
+            await self._process_message(channel, event.message)
+        
+        @self.client.on(events.MessageEdited(chats=list(self.channels.values())))
+        async def edit_handler(event: events.MessageEdited.Event):
+            channel = self._peer_channels.get(event.chat_id)
+            if channel is not None:
+                await self._process_edit(channel, event.message)
+        
+        @self.client.on(events.MessageDeleted(chats=list(self.channels.values())))
+        async def delete_handler(event: events.MessageDeleted.Event):
+            channel = self._peer_channels.get(event.chat_id)
+            if channel is not None:
+                await self._process_deletion(channel, event.deleted_ids)
         
-        print(f"Парсер запущен и отслеживает канал: {self.channel_id}")
+        await self.catch_up()
+        
+        print(f"Парсер запущен и отслеживает каналы: {', '.join(self.channels)}")
     
-    async def _process_message(self, message: Message):
+    async def _process_message(self, channel: str, message: Message):
         """Обработка нового сообщения из канала."""
         try:
-            db = SessionLocal()
-            try:
-                existing_post = db.query(Post).filter(
-                    Post.message_id == message.id
-                ).first()
-                
-                if existing_post:
-                    return
-                
-                parsed_data = self._parse_message(message.text or "")
-                
-                post = Post(
-                    channel_id=str(self.channel_id),
-                    message_id=message.id,
-                    service_type=parsed_data.get('service_type'),
-                    description=parsed_data.get('description'),
-                    published_date=message.date if message.date else datetime.now()
-                )
-                
-                db.add(post)
-                db.commit()
-                
-                print(f"Обработано новое сообщение: ID={message.id}, Тип услуги={parsed_data.get('service_type')}")
-                
-            finally:
-                db.close()
-                
+            await self.ingest.put(self._build_post(channel, message))
         except Exception as e:
             print(f"Ошибка при обработке сообщения: {e}")
     
-    def _parse_message(self, text: str) -> dict:
-        """Парсинг текста сообщения для извлечения информации."""
-        result = {
-            'service_type': None,
-            'description': None
-        }
+    async def _process_edit(self, channel: str, message: Message):
+        """Обработка отредактированного сообщения: повторное извлечение данных."""
+        try:
+            await self.ingest.put_edit(self._build_post(channel, message))
+        except Exception as e:
+            print(f"Ошибка при обработке редактирования сообщения: {e}")
+    
+    async def _process_deletion(self, channel: str, message_ids: list[int]):
+        """Обработка удаленных сообщений: мягкое удаление постов."""
+        try:
+            await self.ingest.put_deletes(channel, message_ids)
+        except Exception as e:
+            print(f"Ошибка при обработке удаления сообщений: {e}")
+    
+    def _build_post(self, channel: str, message: Message) -> dict:
+        """Формирование строки таблицы posts из сообщения канала."""
+        return self._post_row(channel, message, self._parse_message(message.text or ""))
+    
+    async def _build_posts(self, channel: str, messages: list[Message]) -> list[dict]:
+        """Формирование строк таблицы posts для пакета сообщений."""
+        texts = [message.text or "" for message in messages]
         
-        if not text:
-            return result
+        if self.executor is None or len(texts) < Config.PARSER_POOL_MIN_BATCH:
+            parsed = self.extractor.parse_many(texts)
+        else:
+            parsed = await self._parse_in_pool(texts)
         
-        service_patterns = [
-            r'(?:тип|услуга|проект|вид)[\s:]+([^\n]+)',
-            r'(?:выполнен|сделан|реализован)[\s:]+([^\n]+)',
-        ]
+        return [self._post_row(channel, message, data) for message, data in zip(messages, parsed)]
+    
+    async def _parse_in_pool(self, texts: list[str]) -> list[dict]:
+        """Парсинг пакета текстов в пуле процессов."""
+        loop = asyncio.get_running_loop()
+        chunk_size = Config.PARSER_POOL_CHUNK_SIZE
         
-        for pattern in service_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                result['service_type'] = match.group(1).strip()
-                break
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(self.executor, parse_chunk, texts[start:start + chunk_size])
+            for start in range(0, len(texts), chunk_size)
+        ))
         
-        if not result['service_type']:
-            lines = text.split('\n')
-            if lines:
-                first_line = lines[0].strip()
-                if len(first_line) < 100:
-                    result['service_type'] = first_line
+        fields = self.extractor.fields
+        return [dict(zip(fields, record)) for chunk in chunks for record in chunk]
+    
+    def _post_row(self, channel: str, message: Message, parsed_data: dict) -> dict:
+        """Строка таблицы posts из сообщения и извлеченных из него данных."""
+        return {
+            'channel_id': channel,
+            'message_id': message.id,
+            'service_type': parsed_data.get('service_type'),
+            'description': parsed_data.get('description'),
+            'published_date': message.date if message.date else datetime.now(),
+        }
+    
+    async def backfill(
+        self,
+        page_size: int | None = None,
+        from_start: bool = False,
+        channels: list[str] | None = None
+    ) -> int:
+        """Импорт истории каналов страницами с сохранением контрольной точки после каждой."""
+        checkpoints = {} if from_start else await self._load_checkpoints()
+        imported = 0
         
-        result['description'] = text[:500] if len(text) > 500 else text
+        for channel in channels or list(self.channels):
+            last_message_id = checkpoints.get(channel, 0)
+            print(f"Импорт истории канала {channel} начиная с сообщения ID={last_message_id}")
+            
+            channel_imported, last_message_id = await self._import_history(
+                channel,
+                last_message_id,
+                page_size,
+                lambda page, channel=channel: self._store_page(channel, page)
+            )
+            imported += channel_imported
+            
+            print(f"Импорт истории канала {channel} завершен: новых постов {channel_imported}, последнее сообщение ID={last_message_id}")
         
-        return result
+        return imported
+    
+    async def catch_up(self) -> int:
+        """Догрузка сообщений, опубликованных после последних сохраненных постов каналов."""
+        self._catching_up = True
+        caught_up: dict[str, int] = {}
+        try:
+            caught_up = await self._load_last_message_ids()
+            semaphore = asyncio.Semaphore(Config.CATCH_UP_CONCURRENCY)
+            
+            async def catch_up_channel(channel: str, last_message_id: int) -> int:
+                async with semaphore:
+                    imported, caught_up[channel] = await self._import_history(
+                        channel, last_message_id, None, self.ingest.write
+                    )
+                if imported:
+                    print(f"Канал {channel}: догружены пропущенные сообщения: {imported}, последнее сообщение ID={caught_up[channel]}")
+                return imported
+            
+            results = await asyncio.gather(
+                *(
+                    catch_up_channel(channel, last_message_id)
+                    for channel, last_message_id in list(caught_up.items())
+                    if channel in self.channels
+                ),
+                return_exceptions=True
+            )
+            
+            imported = 0
+            for result in results:
+                if isinstance(result, Exception):
+                    print(f"Ошибка при догрузке пропущенных сообщений: {result}")
+                else:
+                    imported += result
+            return imported
+            
+        except Exception as e:
+            print(f"Ошибка при догрузке пропущенных сообщений: {e}")
+            return 0
+        finally:
+            pending, self._pending_live = self._pending_live, []
+            self._catching_up = False
+            for channel, message in pending:
+                if message.id > caught_up.get(channel, 0):
+                    await self._process_message(channel, message)
+    
+    async def _import_history(
+        self,
+        channel: str,
+        min_id: int,
+        page_size: int | None,
+        store_page
+    ) -> tuple[int, int]:
+        """Чтение сообщений канала новее min_id и запись их страницами через store_page."""
+        page_size = page_size or Config.BACKFILL_PAGE_SIZE
+        last_message_id = min_id
+        imported = 0
+        
+        while True:
+            try:
+                page = []
+                async for message in self.client.iter_messages(
+                    self.channels[channel],
+                    reverse=True,
+                    min_id=last_message_id,
+                    wait_time=Config.BACKFILL_WAIT_TIME
+                ):
+                    if isinstance(message, MessageService):
+                        continue
+                    
+                    page.append(message)
+                    if len(page) >= page_size:
+                        imported += await store_page(await self._build_posts(channel, page))
+                        last_message_id = page[-1].id
+                        page = []
+                
+                if page:
+                    imported += await store_page(await self._build_posts(channel, page))
+                    last_message_id = page[-1].id
+                break
+                
+            except FloodWaitError as e:
+                print(f"FloodWait: ожидание {e.seconds} сек., продолжение канала {channel} с сообщения ID={last_message_id}")
+                await asyncio.sleep(e.seconds)
+        
+        return imported, last_message_id
+    
+    async def _store_page(self, channel: str, page: list[dict]) -> int:
+        """Запись страницы истории и обновление контрольной точки канала."""
+        inserted = await self.ingest.write(page)
+        await self._save_checkpoint(channel, page[-1]['message_id'])
+        print(f"Канал {channel}: страница истории сохранена до сообщения ID={page[-1]['message_id']}, новых постов {inserted}")
+        return inserted
+    
+    async def _load_checkpoints(self) -> dict[str, int]:
+        """Получение ID последних импортированных сообщений по каналам."""
+        async with AsyncSessionLocal() as db:
+            rows = await db.execute(
+                select(ParserCheckpoint.channel_id, ParserCheckpoint.last_message_id)
+            )
+            return {channel: last_message_id for channel, last_message_id in rows}
+    
+    async def _load_last_message_ids(self) -> dict[str, int]:
+        """Получение максимальных ID сообщений, сохраненных в базе, по каналам."""
+        async with AsyncSessionLocal() as db:
+            rows = await db.execute(
+                select(Post.channel_id, func.max(Post.message_id)).group_by(Post.channel_id)
+            )
+            return {channel: last_message_id for channel, last_message_id in rows}
+    
+    async def _save_checkpoint(self, channel: str, last_message_id: int):
+        """Сохранение ID последнего импортированного сообщения канала."""
+        statement = dialect_insert(ParserCheckpoint.__table__).values(
+            channel_id=channel,
+            last_message_id=last_message_id
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=['channel_id'],
+            set_={'last_message_id': last_message_id, 'updated_at': func.now()}
+        )
+        async with AsyncSessionLocal() as db:
+            await db.execute(statement)
+            await db.commit()
+    
+    def _parse_message(self, text: str) -> dict:
+        """Парсинг текста сообщения для извлечения информации."""
+        return self.extractor.parse(text)
     
     async def stop(self):
         """Остановка парсера."""
         self.running = False
+        if self._catch_up_task is not None:
+            self._catch_up_task.cancel()
+            await asyncio.gather(self._catch_up_task, return_exceptions=True)
+            self._catch_up_task = None
+        await self.ingest.stop()
+        if self.executor is not None:
+            await asyncio.to_thread(self.executor.shutdown, cancel_futures=True)
+            self.executor = None
         await self.client.disconnect()
         print("Парсер остановлен")
     
@@ -112,7 +324,18 @@ class ChannelParser:
         """Запуск парсера в бесконечном цикле."""
         await self.start()
         try:
-            await self.client.run_until_disconnected()
+            while self.running:
+                await self.client.run_until_disconnected()
+                if not self.running:
+                    break
+                
+                print("Соединение с Telegram потеряно, переподключение...")
+                await asyncio.sleep(Config.RECONNECT_DELAY)
+                try:
+                    await self.client.connect()
+                    await self.catch_up()
+                except Exception as e:
+                    print(f"Ошибка при переподключении парсера: {e}")
         except KeyboardInterrupt:
             await self.stop()
 
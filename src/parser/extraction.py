@@ -0,0 +1,167 @@
+"""Движок извлечения информации из текста постов по настраиваемым правилам."""
+import re
+from src.config import Config
+
+
+def _first_line(text: str, limit: int | None) -> str | None:
+    """Первая строка текста, если она короче limit."""
+    end = text.find('\n')
+    line = (text if end == -1 else text[:end]).strip()
+    if limit is not None and len(line) >= limit:
+        return None
+    return line
+
+
+def _head(text: str, limit: int | None) -> str:
+    """Начало текста длиной не более limit символов."""
+    return text[:limit] if limit is not None else text
+
+
+FALLBACKS = {
+    'first_line': _first_line,
+    'head': _head,
+}
+
+
+def _check_lowercase(pattern: str):
+    """Проверка, что шаблон записан в нижнем регистре (без учета escape-последовательностей)."""
+    escaped = False
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif char != char.lower():
+            raise ValueError(
+                f"Шаблон правила должен быть записан в нижнем регистре: {pattern!r}"
+            )
+
+
+class CompiledPattern:
+    """Шаблон правила, скомпилированный для текста в нижнем регистре и для исходного текста."""
+    
+    __slots__ = ('folded', 'exact', 'group')
+    
+    def __init__(self, pattern: str):
+        _check_lowercase(pattern)
+        self.folded = re.compile(pattern)
+        self.exact = re.compile(pattern, re.IGNORECASE)
+        self.group = 1 if self.folded.groups else 0
+
+
+class ExtractionRule:
+    """Правило извлечения значения поля из текста поста."""
+    
+    def __init__(
+        self,
+        field: str,
+        patterns: list[str] | None = None,
+        priority: int = 0,
+        fallback: str | None = None,
+        fallback_limit: int | None = None
+    ):
+        if fallback is not None and fallback not in FALLBACKS:
+            raise ValueError(f"Неизвестный fallback правила для поля {field}: {fallback}")
+        
+        self.field = field
+        self.patterns = [CompiledPattern(pattern) for pattern in patterns or []]
+        self.priority = priority
+        self.fallback = fallback
+        self.fallback_limit = fallback_limit
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ExtractionRule':
+        """Создание правила из описания в конфигурации."""
+        return cls(
+            field=data['field'],
+            patterns=data.get('patterns'),
+            priority=data.get('priority', 0),
+            fallback=data.get('fallback'),
+            fallback_limit=data.get('fallback_limit')
+        )
+
+
+class ExtractionEngine:
+    """
+    Извлечение полей поста по набору правил, скомпилированных один раз.
+    
+    Регистр текста приводится к нижнему один раз на сообщение, после чего
+    шаблоны всех полей проверяются в порядке приоритета без флага IGNORECASE.
+    Для каждого поля поиск останавливается на первом совпадении, а fallback
+    применяется, только если ни один шаблон поля не сработал.
+    """
+    
+    def __init__(self, rules: list[ExtractionRule]):
+        ordered = sorted(enumerate(rules), key=lambda item: (item[1].priority, item[0]))
+        
+        plan: dict[str, tuple[list[CompiledPattern], list]] = {}
+        for _, rule in ordered:
+            patterns, fallback = plan.setdefault(rule.field, ([], []))
+            patterns.extend(rule.patterns)
+            if rule.fallback and not fallback:
+                fallback.append((FALLBACKS[rule.fallback], rule.fallback_limit))
+        
+        self.fields = tuple(plan)
+        self._plan = tuple(
+            (field, tuple(patterns), fallback[0] if fallback else None)
+            for field, (patterns, fallback) in plan.items()
+        )
+    
+    @classmethod
+    def from_config(cls, rules: list[dict] | None = None) -> 'ExtractionEngine':
+        """Создание движка из правил конфигурации."""
+        rules = Config.EXTRACTION_RULES if rules is None else rules
+        return cls([ExtractionRule.from_dict(rule) for rule in rules])
+    
+    def parse(self, text: str) -> dict:
+        """Извлечение всех полей из текста сообщения."""
+        result = dict.fromkeys(self.fields)
+        
+        if not text:
+            return result
+        
+        folded = text.lower()
+        use_exact = len(folded) != len(text)
+        
+        for field, patterns, fallback in self._plan:
+            value = None
+            
+            for pattern in patterns:
+                if use_exact:
+                    match = pattern.exact.search(text)
+                else:
+                    match = pattern.folded.search(folded)
+                if match:
+                    value = text[match.start(pattern.group):match.end(pattern.group)].strip()
+                    break
+            
+            if not value and fallback:
+                function, limit = fallback
+                value = function(text, limit)
+            
+            result[field] = value
+        
+        return result
+    
+    def parse_many(self, texts: list[str]) -> list[dict]:
+        """Извлечение полей из пакета сообщений."""
+        parse = self.parse
+        return [parse(text) for text in texts]
+
+
+_worker_engine: ExtractionEngine | None = None
+
+
+def init_worker(rules: list[dict]):
+    """Инициализация движка в процессе пула парсинга."""
+    global _worker_engine
+    _worker_engine = ExtractionEngine.from_config(rules)
+
+
+def parse_chunk(texts: list[str]) -> list[tuple]:
+    """Парсинг пакета текстов в процессе пула; значения полей возвращаются кортежами."""
+    fields = _worker_engine.fields
+    return [
+        tuple(parsed[field] for field in fields)
+        for parsed in _worker_engine.parse_many(texts)
+    ]
@@ -0,0 +1,284 @@
+"""Очередь пакетной записи постов в базу данных."""
+import asyncio
+from datetime import datetime, timezone
+from typing import Callable
+from sqlalchemy import select, update, bindparam, tuple_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.config import Config
+from src.database.db import AsyncSessionLocal, dialect_insert
+from src.database.models import Post
+from src.utils.metrics import PARSER_LAG, PARSER_POSTS, PARSER_PENDING, PARSER_DROPPED
+
+
+EDITABLE_FIELDS = ('service_type', 'description')
+
+
+def observe_lag(rows: list[dict]):
+    """Задержка от публикации сообщений до записи их постов в БД."""
+    now = datetime.now(timezone.utc)
+    local_now = datetime.now()
+    for row in rows:
+        published = row.get('published_date')
+        if published is not None:
+            lag = (now if published.tzinfo else local_now) - published
+            PARSER_LAG.observe(max(lag.total_seconds(), 0.0))
+
+
+class PostIngestQueue:
+    """
+    Накопление новых, измененных и удаленных постов и запись их пакетами в одной транзакции.
+    
+    Незаписанные из-за ошибки БД изменения остаются в очереди до следующей
+    попытки, но не больше max_pending: сверх этого новые изменения
+    отбрасываются. Отброшенные новые посты новее всех сохраненных, поэтому
+    после восстановления записи их догружает on_recovered (catch-up парсера).
+    """
+    
+    def __init__(
+        self,
+        batch_size: int | None = None,
+        flush_interval: float | None = None,
+        on_commit: Callable[[], None] | None = None,
+        max_pending: int | None = None,
+        on_recovered: Callable[[], None] | None = None
+    ):
+        self.batch_size = batch_size or Config.INGEST_BATCH_SIZE
+        self.flush_interval = flush_interval or Config.INGEST_FLUSH_INTERVAL
+        self.max_pending = max_pending or Config.INGEST_MAX_PENDING
+        self.on_commit = on_commit
+        self.on_recovered = on_recovered
+        self.dropped = 0
+        self._buffer: list[dict] = []
+        self._edits: dict[tuple[str, int], dict] = {}
+        self._deletes: dict[str, set[int]] = {}
+        self._deletes_count = 0
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: asyncio.Task | None = None
+        PARSER_PENDING.set_function(lambda: self.pending)
+    
+    def start(self):
+        """Запуск фоновой записи по таймеру."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    @property
+    def pending(self) -> int:
+        """Количество изменений, ожидающих записи."""
+        return len(self._buffer) + len(self._edits) + self._deletes_count
+    
+    def _accept(self, kind: str) -> bool:
+        """Проверка места в очереди; при переполнении изменение отбрасывается."""
+        if self.pending < self.max_pending:
+            return True
+        if not self.dropped:
+            print(f"⚠️ Очередь записи постов переполнена ({self.pending}), новые изменения отбрасываются до восстановления записи в БД")
+        self.dropped += 1
+        PARSER_DROPPED.labels(kind).inc()
+        return False
+    
+    async def put(self, row: dict):
+        """Добавление поста в очередь; при заполнении пакета - запись в БД."""
+        if not self._accept('post'):
+            return
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size:
+            await self.flush()
+    
+    async def put_edit(self, row: dict):
+        """Добавление отредактированного поста; повторные правки одного поста схлопываются."""
+        if (row['channel_id'], row['message_id']) not in self._edits and not self._accept('edit'):
+            return
+        self._edits[(row['channel_id'], row['message_id'])] = row
+        if len(self._edits) >= self.batch_size:
+            await self.flush()
+    
+    async def put_deletes(self, channel: str, message_ids: list[int]):
+        """Добавление удаленных сообщений канала для мягкого удаления постов."""
+        if not self._accept('delete'):
+            return
+        deleted = self._deletes.setdefault(channel, set())
+        before = len(deleted)
+        deleted.update(message_ids)
+        self._deletes_count += len(deleted) - before
+        if self._deletes_count >= self.batch_size:
+            await self.flush()
+    
+    async def flush(self) -> int:
+        """Запись накопленных изменений одной транзакцией. Возвращает число новых постов."""
+        async with self._lock:
+            if not self.pending:
+                return 0
+            
+            batch = self._buffer[:self.batch_size]
+            del self._buffer[:self.batch_size]
+            edits, self._edits = list(self._edits.values()), {}
+            deletes, self._deletes = self._deletes, {}
+            self._deletes_count = 0
+            
+            try:
+                async with AsyncSessionLocal() as db:
+                    inserted = await self._insert(db, batch)
+                    updated = await self._apply_edits(db, edits)
+                    deleted = await self._apply_deletes(db, deletes)
+                    await db.commit()
+            except Exception as e:
+                print(
+                    f"Ошибка при сохранении пакета постов "
+                    f"(новых {len(batch)}, правок {len(edits)}, удалений {sum(map(len, deletes.values()))}): {e}"
+                )
+                self._restore(batch, edits, deletes)
+                return 0
+            
+            if inserted or updated or deleted:
+                self._notify_commit()
+            if batch:
+                observe_lag(batch)
+                PARSER_POSTS.inc(inserted)
+                print(f"Сохранено новых постов: {inserted} из {len(batch)}")
+            if edits or deletes:
+                print(f"Обновлено постов: {updated}, удалено постов: {deleted}")
+            if self.dropped:
+                print(f"Запись постов восстановлена, отброшено изменений при переполнении очереди: {self.dropped}")
+                self.dropped = 0
+                self._notify(self.on_recovered)
+            return inserted
+    
+    def _restore(self, batch: list[dict], edits: list[dict], deletes: dict[str, set[int]]):
+        """Возврат незаписанных изменений в очередь; более поздние правки того же поста сохраняются."""
+        self._buffer[:0] = batch
+        for row in edits:
+            self._edits.setdefault((row['channel_id'], row['message_id']), row)
+        for channel, message_ids in deletes.items():
+            self._deletes.setdefault(channel, set()).update(message_ids)
+        self._deletes_count = sum(map(len, self._deletes.values()))
+    
+    async def write(self, rows: list[dict]) -> int:
+        """Запись постов пакетами в обход буфера; ошибки пробрасываются вызывающему."""
+        inserted = 0
+        for start in range(0, len(rows), self.batch_size):
+            async with AsyncSessionLocal() as db:
+                inserted += await self._insert(db, rows[start:start + self.batch_size])
+                await db.commit()
+        PARSER_POSTS.inc(inserted)
+        if inserted:
+            self._notify_commit()
+        return inserted
+    
+    def _notify_commit(self):
+        """Уведомление подписчика о записанных в БД изменениях постов."""
+        self._notify(self.on_commit)
+    
+    def _notify(self, callback: Callable[[], None] | None):
+        """Вызов обработчика очереди с перехватом ошибок."""
+        if callback is None:
+            return
+        try:
+            callback()
+        except Exception as e:
+            print(f"Ошибка в обработчике записи постов: {e}")
+    
+    async def _insert(self, db: AsyncSession, batch: list[dict]) -> int:
+        """Вставка пакета постов с пропуском уже сохраненных."""
+        if not batch:
+            return 0
+        
+        statement = dialect_insert(Post.__table__).on_conflict_do_nothing(
+            index_elements=['channel_id', 'message_id']
+        )
+        result = await db.execute(statement, batch)
+        return max(result.rowcount, 0)
+    
+    async def _apply_edits(self, db: AsyncSession, rows: list[dict]) -> int:
+        """Обновление только изменившихся полей отредактированных постов."""
+        if not rows:
+            return 0
+        
+        keys = [(row['channel_id'], row['message_id']) for row in rows]
+        result = await db.execute(
+            select(Post.id, Post.channel_id, Post.message_id, *(getattr(Post, field) for field in EDITABLE_FIELDS))
+            .where(tuple_(Post.channel_id, Post.message_id).in_(keys))
+        )
+        existing = {(channel, message_id): (post_id, values) for post_id, channel, message_id, *values in result}
+        
+        missing = []
+        changes: dict[tuple[str, ...], list[dict]] = {}
+        for row in rows:
+            current = existing.get((row['channel_id'], row['message_id']))
+            if current is None:
+                missing.append(row)
+                continue
+            
+            post_id, values = current
+            changed = {
+                field: row[field]
+                for field, value in zip(EDITABLE_FIELDS, values)
+                if row[field] != value
+            }
+            if changed:
+                params = {f"new_{field}": value for field, value in changed.items()}
+                params['post_id'] = post_id
+                changes.setdefault(tuple(changed), []).append(params)
+        
+        await self._insert(db, missing)
+        
+        table = Post.__table__
+        for fields, params in changes.items():
+            statement = update(table).where(table.c.id == bindparam('post_id')).values(
+                updated_at=func.now(),
+                **{field: bindparam(f"new_{field}") for field in fields}
+            )
+            await db.execute(statement, params)
+        
+        return sum(map(len, changes.values()))
+    
+    async def _apply_deletes(self, db: AsyncSession, deletes: dict[str, set[int]]) -> int:
+        """Мягкое удаление постов по ID сообщений каналов."""
+        table = Post.__table__
+        deleted = 0
+        for channel, message_ids in deletes.items():
+            message_ids = sorted(message_ids)
+            for start in range(0, len(message_ids), self.batch_size):
+                result = await db.execute(
+                    update(table)
+                    .where(
+                        table.c.channel_id == channel,
+                        table.c.message_id.in_(message_ids[start:start + self.batch_size]),
+                        table.c.deleted_at.is_(None)
+                    )
+                    .values(deleted_at=func.now())
+                )
+                deleted += max(result.rowcount, 0)
+        return deleted
+    
+    async def _run(self):
+        """Периодическая запись неполного пакета до сигнала остановки."""
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            if not self._stopping:
+                await self.flush()
+    
+    async def stop(self):
+        """Остановка фоновой записи (текущий пакет дописывается) и сброс всех оставшихся постов."""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+            self._stopping = False
+            self._wakeup.clear()
+        
+        await self.drain()
+    
+    async def drain(self):
+        """Сброс всех накопленных изменений; при ошибке записи сброс прекращается."""
+        while self.pending:
+            before = self.pending
+            await self.flush()
+            if self.pending >= before:
+                print(f"Не записано изменений постов: {self.pending}")
+                return
@@ -0,0 +1,59 @@
+"""Запуск парсера каналов в отдельном процессе."""
+import asyncio
+import signal
+from telethon import TelegramClient
+from src.config import Config
+from src.database.db import close_db
+from src.parser.channel_parser import ChannelParser
+from src.utils.ipc import EventBus
+from src.utils.metrics import start_metrics_server
+from src.utils.tracing import print_summary
+
+
+async def authorize_session():
+    """
+    Авторизация сессии Telethon в текущем процессе.
+    
+    Дочерние процессы супервизора не могут запросить номер телефона и код
+    подтверждения, поэтому при первом запуске это делается в основном процессе.
+    """
+    client = TelegramClient(Config.SESSION_NAME, Config.API_ID, Config.API_HASH)
+    try:
+        await client.start()
+    finally:
+        await client.disconnect()
+
+
+async def run_parser():
+    """Работа парсера до сигнала остановки с оповещением процессов бота через шину событий."""
+    metrics = await start_metrics_server(0)
+    event_bus = EventBus()
+    await event_bus.start()
+    parser = ChannelParser(event_bus)
+    task = asyncio.create_task(parser.run_forever())
+    
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    
+    try:
+        await asyncio.wait([task, asyncio.create_task(stop.wait())], return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+        await parser.stop()
+        await event_bus.stop()
+        if metrics is not None:
+            await metrics.stop()
+        await close_db()
+        if Config.SQL_TRACE:
+            print_summary()
+
+
+def parser_process():
+    """Точка входа процесса парсера."""
+    asyncio.run(run_parser())
@@ -0,0 +1,191 @@
+"""Запуск парсера и бота в отдельных процессах под наблюдением супервизора."""
+import asyncio
+import multiprocessing
+import signal
+import time
+from dataclasses import dataclass
+from multiprocessing.process import BaseProcess
+from typing import Callable
+from src.config import Config
+from src.database.db import init_db, close_db
+from src.parser.runner import authorize_session, parser_process
+from src.bot.bot import polling_worker
+from src.bot.webhook import set_webhook, webhook_worker
+from src.utils.ipc import EventBroker
+
+
+@dataclass
+class ProcessSpec:
+    """
+    Описание дочернего процесса и политики его перезапуска.
+    
+    always - перезапуск после любого завершения, on-failure - только после
+    завершения с ненулевым кодом, never - без перезапуска.
+    """
+    name: str
+    target: Callable[..., None]
+    args: tuple = ()
+    restart: str = 'always'
+
+
+@dataclass
+class ChildProcess:
+    """Состояние дочернего процесса в супервизоре."""
+    spec: ProcessSpec
+    process: BaseProcess | None = None
+    started_at: float = 0.0
+    restart_at: float | None = None
+    failures: int = 0
+    finished: bool = False
+    restarts: int = 0
+
+
+class Supervisor:
+    """
+    Запуск дочерних процессов и их перезапуск согласно политикам.
+    
+    Перезапуск откладывается с экспоненциально растущей задержкой; счетчик
+    неудач сбрасывается, если процесс успел проработать reset_after секунд.
+    Супервизор также держит брокер шины событий, через который парсер
+    оповещает процессы бота.
+    """
+    
+    def __init__(
+        self,
+        specs: list[ProcessSpec],
+        restart_delay: float | None = None,
+        max_restart_delay: float | None = None,
+        reset_after: float | None = None,
+        stop_timeout: float | None = None,
+        poll_interval: float = 0.5
+    ):
+        self.children = [ChildProcess(spec) for spec in specs]
+        self.restart_delay = restart_delay if restart_delay is not None else Config.RESTART_DELAY
+        self.max_restart_delay = max_restart_delay if max_restart_delay is not None else Config.RESTART_MAX_DELAY
+        self.reset_after = reset_after if reset_after is not None else Config.RESTART_RESET_AFTER
+        self.stop_timeout = stop_timeout if stop_timeout is not None else Config.STOP_TIMEOUT
+        self.poll_interval = poll_interval
+        self.broker = EventBroker()
+        self._context = multiprocessing.get_context('spawn')
+    
+    def _start(self, child: ChildProcess):
+        """Запуск процесса."""
+        child.process = self._context.Process(
+            target=child.spec.target,
+            args=child.spec.args,
+            name=child.spec.name
+        )
+        child.process.start()
+        child.started_at = time.monotonic()
+        child.restart_at = None
+        print(f"✅ Процесс {child.spec.name} запущен (PID {child.process.pid})")
+    
+    def _check(self, child: ChildProcess, now: float):
+        """Обработка завершения процесса и запуск отложенного перезапуска."""
+        if child.finished:
+            return
+        
+        if child.restart_at is not None:
+            if now >= child.restart_at:
+                child.restarts += 1
+                self._start(child)
+            return
+        
+        exitcode = child.process.exitcode
+        if exitcode is None:
+            return
+        
+        policy = child.spec.restart
+        if policy == 'never' or (policy == 'on-failure' and exitcode == 0):
+            child.finished = True
+            print(f"Процесс {child.spec.name} завершился с кодом {exitcode}")
+            return
+        
+        if now - child.started_at >= self.reset_after:
+            child.failures = 0
+        delay = min(self.restart_delay * 2 ** child.failures, self.max_restart_delay)
+        child.failures += 1
+        child.restart_at = now + delay
+        print(f"⚠️ Процесс {child.spec.name} завершился с кодом {exitcode}, перезапуск через {delay:.1f} с")
+    
+    async def run(self, stop: asyncio.Event):
+        """Работа до сигнала остановки или завершения всех процессов без перезапуска."""
+        await self.broker.start()
+        try:
+            for child in self.children:
+                self._start(child)
+            
+            while not all(child.finished for child in self.children):
+                try:
+                    await asyncio.wait_for(stop.wait(), self.poll_interval)
+                    break
+                except asyncio.TimeoutError:
+                    pass
+                now = time.monotonic()
+                for child in self.children:
+                    self._check(child, now)
+        finally:
+            await self._stop_children()
+            await self.broker.stop()
+    
+    async def _stop_children(self):
+        """Остановка процессов по SIGTERM с принудительным завершением по таймауту."""
+        running = [child.process for child in self.children if child.process is not None and child.process.is_alive()]
+        for process in running:
+            process.terminate()
+        
+        deadline = time.monotonic() + self.stop_timeout
+        for process in running:
+            await asyncio.to_thread(process.join, max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                print(f"Процесс {process.name} не остановился за {self.stop_timeout} с и будет завершен принудительно")
+                process.kill()
+                await asyncio.to_thread(process.join)
+
+
+def build_specs() -> list[ProcessSpec]:
+    """Процессы приложения: парсер и бот (в режиме webhook - несколько воркеров)."""
+    specs = [ProcessSpec('parser', parser_process, restart=Config.PARSER_RESTART)]
+    
+    if Config.BOT_MODE == 'webhook':
+        specs += [
+            ProcessSpec(f'webhook-{index}', webhook_worker, (index,), Config.BOT_RESTART)
+            for index in range(Config.WEBHOOK_WORKERS)
+        ]
+    else:
+        specs.append(ProcessSpec('bot', polling_worker, restart=Config.BOT_RESTART))
+    
+    return specs
+
+
+async def prepare():
+    """Авторизация сессии парсера, подготовка базы данных и регистрация вебхука до запуска процессов."""
+    await authorize_session()
+    try:
+        await init_db()
+        print("✅ База данных инициализирована")
+        if Config.BOT_MODE == 'webhook':
+            await set_webhook()
+            print(f"✅ Вебхук зарегистрирован: {Config.WEBHOOK_URL.rstrip('/')}{Config.WEBHOOK_PATH}")
+    finally:
+        await close_db()
+
+
+async def run_supervisor():
+    """Запуск приложения под супервизором до сигнала остановки."""
+    Config.validate()
+    print("✅ Конфигурация загружена успешно")
+    await prepare()
+    
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    
+    await Supervisor(build_specs()).run(stop)
+    print("✅ Приложение остановлено")
+
+
+def main():
+    """Точка входа супервизора."""
+    asyncio.run(run_supervisor())
@@ -0,0 +1,74 @@
+"""Кэш отрисованных страниц ленты постов."""
+from collections import OrderedDict
+from typing import Any, Hashable
+from src.config import Config
+from src.utils.ipc import EventBus, POSTS_CHANGED
+
+
+class LRUCache:
+    """Словарь ограниченного размера с вытеснением давно не использованных записей."""
+    
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Значение по ключу; запись становится самой свежей."""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def set(self, key: Hashable, value: Any):
+        """Сохранение значения с вытеснением самой старой записи при переполнении."""
+        if self.max_size <= 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+    
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Удаление записи по ключу."""
+        return self._data.pop(key, default)
+    
+    def clear(self):
+        """Удаление всех записей."""
+        self._data.clear()
+
+
+feed_pages = LRUCache(Config.FEED_CACHE_SIZE)
+feed_counts: dict[int | None, tuple[float, int]] = {}
+
+
+def invalidate_feed():
+    """Сброс отрисованных страниц и количества постов после изменения постов."""
+    feed_pages.clear()
+    feed_counts.clear()
+
+
+def follow_feed_events(event_bus: EventBus):
+    """
+    Сброс кэша ленты по событиям парсера, работающего в другом процессе.
+    
+    Пока соединения с шиной нет, события теряются, поэтому кэш страниц
+    отключается и сбрасывается при каждой смене состояния соединения.
+    """
+    max_size = feed_pages.max_size
+    
+    def on_connection(connected: bool):
+        feed_pages.max_size = max_size if connected else 0
+        invalidate_feed()
+    
+    on_connection(False)
+    event_bus.on_connection(on_connection)
+    event_bus.subscribe(POSTS_CHANGED, lambda payload: invalidate_feed())
@@ -0,0 +1,163 @@
+"""Шина событий между процессами приложения через Unix-сокет."""
+import asyncio
+import json
+import os
+from typing import Any, Callable
+from src.config import Config
+
+
+POSTS_CHANGED = 'posts.changed'
+FSM_CHANGED = 'fsm.changed'
+
+MAX_CLIENT_BUFFER = 1024 * 1024
+
+
+class EventBroker:
+    """
+    Сервер шины событий, работающий в процессе-супервизоре.
+    
+    Протокол - JSON по строке на сообщение. Клиент сообщает интересующие
+    его темы сообщением {"subscribe": [...]}, а опубликованное сообщение
+    {"topic": ..., "payload": ...} рассылается всем подписчикам темы, кроме
+    отправителя. Клиент, не успевающий читать сообщения, отключается.
+    """
+    
+    def __init__(self, path: str | None = None):
+        self.path = path or Config.IPC_SOCKET
+        self._clients: dict[asyncio.StreamWriter, set[str]] = {}
+        self._server: asyncio.AbstractServer | None = None
+    
+    async def start(self):
+        """Запуск сервера на Unix-сокете (оставшийся от прошлого запуска файл удаляется)."""
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle, self.path)
+    
+    async def stop(self):
+        """Остановка сервера и отключение клиентов."""
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._clients):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+    
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._clients[writer] = set()
+        try:
+            while line := await reader.readline():
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                
+                if 'subscribe' in message:
+                    self._clients[writer].update(message['subscribe'])
+                elif 'topic' in message:
+                    self._publish(writer, message['topic'], line)
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.pop(writer, None)
+            writer.close()
+    
+    def _publish(self, sender: asyncio.StreamWriter, topic: str, line: bytes):
+        """Рассылка строки сообщения подписчикам темы."""
+        for writer, topics in list(self._clients.items()):
+            if writer is sender or topic not in topics:
+                continue
+            if writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                print("Подписчик шины событий не успевает читать сообщения и будет отключен")
+                self._clients.pop(writer, None)
+                writer.close()
+                continue
+            writer.write(line)
+
+
+class EventBus:
+    """
+    Клиент шины событий с автоматическим переподключением.
+    
+    Публикация не блокирует вызывающего: при отсутствии соединения событие
+    отбрасывается, поэтому подписчики должны считать разрыв связи
+    (on_connection(False)) поводом сбросить все, что зависит от событий.
+    """
+    
+    def __init__(self, path: str | None = None):
+        self.path = path or Config.IPC_SOCKET
+        self._handlers: dict[str, list[Callable[[Any], None]]] = {}
+        self._connection_handlers: list[Callable[[bool], None]] = []
+        self._writer: asyncio.StreamWriter | None = None
+        self._task: asyncio.Task | None = None
+    
+    @property
+    def connected(self) -> bool:
+        """Есть ли соединение с брокером."""
+        return self._writer is not None
+    
+    def subscribe(self, topic: str, handler: Callable[[Any], None]):
+        """Подписка обработчика на тему (до запуска клиента)."""
+        self._handlers.setdefault(topic, []).append(handler)
+    
+    def on_connection(self, handler: Callable[[bool], None]):
+        """Обработчик установки (True) и потери (False) соединения с брокером."""
+        self._connection_handlers.append(handler)
+    
+    def publish(self, topic: str, payload: Any = None) -> bool:
+        """Публикация события. Возвращает False, если соединения с брокером нет."""
+        if self._writer is None:
+            return False
+        self._writer.write(json.dumps({'topic': topic, 'payload': payload}).encode() + b'\n')
+        return True
+    
+    async def start(self):
+        """Запуск подключения к брокеру в фоне."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Отключение от брокера."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def _set_connected(self, connected: bool):
+        for handler in self._connection_handlers:
+            try:
+                handler(connected)
+            except Exception as e:
+                print(f"Ошибка в обработчике соединения шины событий: {e}")
+    
+    async def _run(self):
+        """Подключение, подписка и чтение событий с переподключением при разрыве."""
+        while True:
+            writer = None
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+                writer.write(json.dumps({'subscribe': list(self._handlers)}).encode() + b'\n')
+                self._writer = writer
+                self._set_connected(True)
+                
+                while line := await reader.readline():
+                    message = json.loads(line)
+                    for handler in self._handlers.get(message.get('topic'), []):
+                        try:
+                            handler(message.get('payload'))
+                        except Exception as e:
+                            print(f"Ошибка в обработчике события {message.get('topic')}: {e}")
+            except (OSError, ValueError):
+                pass
+            finally:
+                if self._writer is not None:
+                    self._writer = None
+                    self._set_connected(False)
+                if writer is not None:
+                    writer.close()
+            
+            await asyncio.sleep(Config.IPC_RECONNECT_DELAY)
@@ -0,0 +1,326 @@
+"""Метрики приложения в формате Prometheus и HTTP-эндпоинт для их сбора."""
+import math
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable
+from aiohttp import web
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from src.config import Config
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+LAG_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+SQL_OPERATIONS = frozenset(('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'PRAGMA', 'BEGIN', 'COMMIT', 'ROLLBACK'))
+
+
+def _escape(value: str) -> str:
+    """Экранирование значения метки."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    """Число в формате Prometheus."""
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = '') -> str:
+    """Метки в фигурных скобках: {name="value",...}."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Metric(ABC):
+    """Метрика с набором меток; значения для каждой комбинации меток хранятся отдельно."""
+    
+    kind = 'untyped'
+    
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], object] = {}
+        if not labelnames:
+            self._default = self._children[()] = self._new_child()
+    
+    @abstractmethod
+    def _new_child(self):
+        """Значение метрики для новой комбинации меток."""
+    
+    def labels(self, *values: str):
+        """Значение метрики для комбинации меток."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"Метрика {self.name} ожидает метки {self.labelnames}")
+            child = self._children[values] = self._new_child()
+        return child
+    
+    def render(self) -> list[str]:
+        """Строки метрики в текстовом формате Prometheus."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in list(self._children.items()):
+            lines.extend(self._render_child(_format_labels(self.labelnames, values), values, child))
+        return lines
+    
+    def _render_child(self, labels: str, values: tuple[str, ...], child) -> list[str]:
+        return [f"{self.name}{labels} {_format_value(child.get())}"]
+
+
+class _Value:
+    """Числовое значение счетчика или gauge."""
+    
+    __slots__ = ('value', 'function')
+    
+    def __init__(self):
+        self.value = 0.0
+        self.function: Callable[[], float] | None = None
+    
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+    
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+    
+    def set(self, value: float):
+        self.value = value
+    
+    def set_function(self, function: Callable[[], float]):
+        """Значение вычисляется при каждом сборе метрик."""
+        self.function = function
+    
+    def get(self) -> float:
+        if self.function is not None:
+            try:
+                return float(self.function())
+            except Exception:
+                return math.nan
+        return self.value
+
+
+class Counter(Metric):
+    """Монотонно растущий счетчик."""
+    
+    kind = 'counter'
+    
+    def _new_child(self) -> _Value:
+        return _Value()
+    
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+
+class Gauge(Metric):
+    """Текущее значение, которое может как расти, так и уменьшаться."""
+    
+    kind = 'gauge'
+    
+    def _new_child(self) -> _Value:
+        return _Value()
+    
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+    
+    def dec(self, amount: float = 1.0):
+        self._default.dec(amount)
+    
+    def set(self, value: float):
+        self._default.set(value)
+    
+    def set_function(self, function: Callable[[], float]):
+        self._default.set_function(function)
+
+
+class _HistogramValue:
+    """
+    Гистограмма одной комбинации меток.
+    
+    Наблюдение - поиск корзины делением пополам и увеличение одного счетчика;
+    накопленные значения корзин считаются только при сборе метрик.
+    """
+    
+    __slots__ = ('bounds', 'counts', 'sum')
+    
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+    
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram(Metric):
+    """Распределение значений по корзинам с фиксированными верхними границами."""
+    
+    kind = 'histogram'
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+    
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+    
+    def observe(self, value: float):
+        self._default.observe(value)
+    
+    def _render_child(self, labels: str, values: tuple[str, ...], child: _HistogramValue) -> list[str]:
+        lines = []
+        total = 0
+        for bound, count in zip((*self.buckets, math.inf), child.counts):
+            total += count
+            bucket_labels = _format_labels(self.labelnames, values, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{bucket_labels} {total}")
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {total}")
+        return lines
+
+
+class Registry:
+    """Набор метрик процесса."""
+    
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+    
+    def register(self, metric: Metric) -> Metric:
+        """Добавление метрики; имена метрик уникальны."""
+        if metric.name in self._metrics:
+            raise ValueError(f"Метрика {metric.name} уже зарегистрирована")
+        self._metrics[metric.name] = metric
+        return metric
+    
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+HANDLER_DURATION = REGISTRY.register(Histogram(
+    'bot_handler_duration_seconds', 'Время выполнения обработчиков бота', ('handler', 'status')
+))
+UPDATES_IN_PROGRESS = REGISTRY.register(Gauge(
+    'bot_updates_in_progress', 'Обновления, которые диспетчер обрабатывает в данный момент'
+))
+SENDER_QUEUE = REGISTRY.register(Gauge(
+    'bot_sender_queue_size', 'Сообщения в очереди отправки бота'
+))
+QUERY_DURATION = REGISTRY.register(Histogram(
+    'db_query_duration_seconds', 'Время выполнения SQL-запросов', ('operation',), QUERY_BUCKETS
+))
+QUERY_ERRORS = REGISTRY.register(Counter(
+    'db_query_errors_total', 'SQL-запросы, завершившиеся ошибкой', ('operation',)
+))
+PARSER_LAG = REGISTRY.register(Histogram(
+    'parser_lag_seconds', 'Время от публикации сообщения в канале до записи поста в БД', (), LAG_BUCKETS
+))
+PARSER_POSTS = REGISTRY.register(Counter(
+    'parser_posts_ingested_total', 'Новые посты, записанные парсером'
+))
+PARSER_PENDING = REGISTRY.register(Gauge(
+    'parser_ingest_pending', 'Изменения постов в очереди на запись'
+))
+PARSER_DROPPED = REGISTRY.register(Counter(
+    'parser_ingest_dropped_total', 'Изменения постов, отброшенные при переполнении очереди записи', ('kind',)
+))
+OUTBOX_FAILED = REGISTRY.register(Counter(
+    'bot_outbox_failed_total', 'Уведомления outbox, удаленные после исчерпания попыток доставки'
+))
+
+
+def sql_operation(statement: str) -> str:
+    """Тип SQL-запроса для метки: первое ключевое слово или OTHER."""
+    keyword = statement.lstrip()[:8].split(None, 1)
+    operation = keyword[0].upper() if keyword else ''
+    return operation if operation in SQL_OPERATIONS else 'OTHER'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    QUERY_DURATION.labels(sql_operation(statement)).observe(time.perf_counter() - context._metrics_started)
+
+
+def _handle_error(exception_context):
+    QUERY_ERRORS.labels(sql_operation(exception_context.statement or '')).inc()
+
+
+def instrument_engine(engine: Engine) -> Engine:
+    """Замер времени каждого SQL-запроса движка."""
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+    return engine
+
+
+class MetricsServer:
+    """HTTP-сервер, отдающий метрики процесса по адресу /metrics."""
+    
+    def __init__(self, port: int, host: str | None = None, registry: Registry = REGISTRY):
+        self.port = port
+        self.host = host or Config.METRICS_HOST
+        self.registry = registry
+        self._runner: web.AppRunner | None = None
+    
+    async def _handle(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=self.registry.render().encode(),
+            headers={'Content-Type': CONTENT_TYPE}
+        )
+    
+    async def start(self):
+        """Запуск сервера."""
+        app = web.Application()
+        app.router.add_get('/metrics', self._handle)
+        self._runner = web.AppRunner(app, handle_signals=False, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        print(f"✅ Метрики доступны на http://{self.host}:{self.port}/metrics")
+    
+    async def stop(self):
+        """Остановка сервера."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def start_metrics_server(offset: int = 0) -> MetricsServer | None:
+    """
+    Запуск эндпоинта метрик процесса на порту METRICS_PORT + offset.
+    
+    Без METRICS_PORT метрики выключены и функция возвращает None.
+    """
+    if not Config.METRICS_PORT:
+        return None
+    server = MetricsServer(Config.METRICS_PORT + offset)
+    try:
+        await server.start()
+    except OSError as e:
+        print(f"Не удалось запустить эндпоинт метрик на порту {server.port}: {e}")
+        return None
+    return server
@@ -0,0 +1,164 @@
+"""Трассировка SQL-запросов по обновлениям бота и журнал медленных запросов."""
+import asyncio
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from src.config import Config
+from src.utils.metrics import sql_operation
+
+
+BACKGROUND = '(фон)'
+UNHANDLED = '(без обработчика)'
+EXPLAINED_OPERATIONS = frozenset(('SELECT', 'INSERT', 'UPDATE', 'DELETE'))
+MAX_PARAMETERS_LENGTH = 500
+
+
+class UpdateTrace:
+    """SQL-запросы одного обновления: количество, время и число выполнений каждого запроса."""
+    
+    __slots__ = ('update_id', 'handler', 'task', 'queries', 'duration', 'statements')
+    
+    def __init__(self, update_id: int):
+        self.update_id = update_id
+        self.handler = UNHANDLED
+        self.task = asyncio.current_task()
+        self.queries = 0
+        self.duration = 0.0
+        self.statements: Counter[str] = Counter()
+
+
+@dataclass
+class HandlerStats:
+    """Сводка SQL-запросов обновлений одного обработчика."""
+    updates: int = 0
+    queries: int = 0
+    duration: float = 0.0
+    max_queries: int = 0
+    repeated: Counter = field(default_factory=Counter)
+
+
+current_trace: ContextVar[UpdateTrace | None] = ContextVar('current_trace', default=None)
+handler_stats: dict[str, HandlerStats] = {}
+
+
+def _trace() -> UpdateTrace | None:
+    """Трасса обновления, в задаче которого выполняется запрос (фоновые задачи не учитываются)."""
+    trace = current_trace.get()
+    if trace is not None and trace.task is not asyncio.current_task():
+        return None
+    return trace
+
+
+def _format_parameters(parameters, executemany: bool) -> str:
+    """Параметры запроса для журнала (пакет - первые строки и их количество)."""
+    if executemany:
+        text = f"{len(parameters)} наборов, первый: {parameters[0]!r}" if parameters else "[]"
+    else:
+        text = repr(parameters)
+    if len(text) > MAX_PARAMETERS_LENGTH:
+        text = text[:MAX_PARAMETERS_LENGTH] + '...'
+    return text
+
+
+def explain(conn, statement: str, parameters) -> list[str]:
+    """План запроса: EXPLAIN QUERY PLAN в SQLite, EXPLAIN в остальных СУБД."""
+    sqlite = conn.dialect.name == 'sqlite'
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(("EXPLAIN QUERY PLAN " if sqlite else "EXPLAIN ") + statement, parameters)
+        return [str(row[-1] if sqlite else row[0]) for row in cursor.fetchall()]
+    except Exception as e:
+        return [f"не удалось получить план: {e}"]
+    finally:
+        cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._trace_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._trace_started
+    trace = _trace()
+    
+    if trace is not None:
+        trace.queries += 1
+        trace.duration += elapsed
+        trace.statements[statement] += 1
+    else:
+        stats = handler_stats.setdefault(BACKGROUND, HandlerStats())
+        stats.queries += 1
+        stats.duration += elapsed
+    
+    if elapsed * 1000 < Config.SQL_SLOW_QUERY_MS:
+        return
+    
+    source = f"обновление {trace.update_id}, {trace.handler}" if trace is not None else BACKGROUND
+    lines = [
+        f"🐢 Медленный запрос {elapsed * 1000:.1f} мс ({source}):",
+        f"  {' '.join(statement.split())}",
+        f"  Параметры: {_format_parameters(parameters, executemany)}",
+    ]
+    if sql_operation(statement) in EXPLAINED_OPERATIONS:
+        plan = explain(conn, statement, parameters[0] if executemany and parameters else parameters)
+        if plan:
+            lines.append("  План:")
+            lines.extend(f"    {line}" for line in plan)
+    print('\n'.join(lines))
+
+
+def trace_engine(engine: Engine) -> Engine:
+    """Подключение трассировки SQL-запросов к движку."""
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    return engine
+
+
+def start_update_trace(update_id: int) -> UpdateTrace:
+    """Начало трассировки обновления в текущей задаче."""
+    trace = UpdateTrace(update_id)
+    current_trace.set(trace)
+    return trace
+
+
+def finish_update_trace(trace: UpdateTrace):
+    """Учет обновления в сводке обработчика и строка о нем в журнале."""
+    current_trace.set(None)
+    repeated = {statement: count for statement, count in trace.statements.items() if count > 1}
+    
+    stats = handler_stats.setdefault(trace.handler, HandlerStats())
+    stats.updates += 1
+    stats.queries += trace.queries
+    stats.duration += trace.duration
+    stats.max_queries = max(stats.max_queries, trace.queries)
+    stats.repeated.update(repeated.keys())
+    
+    line = f"🔎 Обновление {trace.update_id} ({trace.handler}): запросов {trace.queries}, БД {trace.duration * 1000:.1f} мс"
+    if repeated:
+        line += f", повторных запросов {sum(repeated.values()) - len(repeated)}"
+    print(line)
+
+
+def print_summary():
+    """Сводка SQL-запросов по обработчикам (выводится при остановке)."""
+    if not handler_stats:
+        return
+    
+    print("📊 SQL-запросы по обработчикам:")
+    print(f"{'Обработчик':<32}{'обновлений':>12}{'запросов/обн.':>15}{'макс.':>8}{'БД, мс/обн.':>14}")
+    for handler, stats in sorted(handler_stats.items(), key=lambda item: -item[1].duration):
+        if handler == BACKGROUND:
+            continue
+        print(
+            f"{handler:<32}{stats.updates:>12}{stats.queries / stats.updates:>15.2f}"
+            f"{stats.max_queries:>8}{stats.duration * 1000 / stats.updates:>14.2f}"
+        )
+        for statement, updates in stats.repeated.most_common(3):
+            print(f"    повторяется в {updates} обновл.: {' '.join(statement.split())[:150]}")
+    
+    background = handler_stats.get(BACKGROUND)
+    if background is not None:
+        print(f"Вне обновлений: запросов {background.queries}, БД {background.duration * 1000:.1f} мс")
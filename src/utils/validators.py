@@ -2,6 +2,12 @@
 import re
 
 
+NAME_PATTERN = re.compile(r'^[a-zA-Zа-яА-ЯёЁ\s\-]+$')
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+PHONE_PATTERN = re.compile(r'^(\+7|7|8)?[\s\-]?\(?[0-9]{3}\)?[\s\-]?[0-9]{3}[\s\-]?[0-9]{2}[\s\-]?[0-9]{2}$')
+TELEGRAM_PATTERN = re.compile(r'^@?[a-zA-Z0-9_]{5,32}$')
+
+
 def validate_name(name: str) -> tuple[bool, str]:
     """
     Валидация имени пользователя.
@@ -20,7 +26,7 @@ def validate_name(name: str) -> tuple[bool, str]:
     if len(name) > 100:
         return False, "Имя слишком длинное (максимум 100 символов)"
     
-    if not re.match(r'^[a-zA-Zа-яА-ЯёЁ\s\-]+$', name):
+    if not NAME_PATTERN.match(name):
         return False, "Имя может содержать только буквы, пробелы и дефисы"
     
     return True, ""
@@ -39,15 +45,7 @@ def validate_contact(contact: str) -> tuple[bool, str]:
     contact = contact.strip()
     
     
-    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    if re.match(email_pattern, contact):
-        return True, ""
-    
-    phone_pattern = r'^(\+7|7|8)?[\s\-]?\(?[0-9]{3}\)?[\s\-]?[0-9]{3}[\s\-]?[0-9]{2}[\s\-]?[0-9]{2}$'
-    
-    telegram_pattern = r'^@?[a-zA-Z0-9_]{5,32}$'
-    
-    if re.match(phone_pattern, contact) or re.match(telegram_pattern, contact):
+    if EMAIL_PATTERN.match(contact) or PHONE_PATTERN.match(contact) or TELEGRAM_PATTERN.match(contact):
         return True, ""
     
     return False, "Контакт должен быть email, телефоном или Telegram username"
@@ -0,0 +1,6 @@
+"""Запуск парсера и бота в отдельных процессах с перезапуском при сбоях."""
+from src.supervisor import main
+
+
+if __name__ == "__main__":
+    main()